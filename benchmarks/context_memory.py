@@ -0,0 +1,113 @@
+"""
+Peak memory of project-context assembly, before and after the ContextBuilder.
+
+Generates a text tree of --size-mb megabytes (1 GB by default) and measures, each
+in a fresh process, the peak RSS (ru_maxrss) of scanning it and assembling the
+Gemini prompt:
+
+  joined   the previous assembly: file segments collected in a list and joined,
+           the cache key hashed from one encoded copy, and the prompt built as
+           f"{context}\\n\\n{instructions}".
+  builder  the current assembly: get_project_context (ContextBuilder), a chunked
+           context_key and the context passed to the SDK as its own part.
+
+Usage:
+    python benchmarks/context_memory.py [--size-mb 1024] [--tree DIR] [--keep]
+
+Linux/macOS only (uses the resource module).
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FILE_SIZE = 256 * 1024
+FILES_PER_DIR = 64
+INSTRUCTIONS = "system prompt\n\nuser prompt"
+
+
+def generate_tree(directory, size_mb):
+    """Write size_mb megabytes of Python-like source files below `directory`."""
+    line = "def function_{0}(argument):\n    return argument * {0}  # padding text for the benchmark\n"
+    block = "".join(line.format(i) for i in range(2000))
+    content = (block * (FILE_SIZE // len(block) + 1))[:FILE_SIZE]
+    for index in range(size_mb * 1024 * 1024 // FILE_SIZE):
+        package = os.path.join(directory, f"package_{index // FILES_PER_DIR}")
+        os.makedirs(package, exist_ok=True)
+        with open(os.path.join(package, f"module_{index}.py"), "w", encoding="utf-8") as f:
+            f.write(content)
+
+
+def assemble_joined(tree):
+    import hashlib
+    from docify_tool.scanner import iter_project_files, read_file
+
+    parts = []
+    for relative_path, file_path in iter_project_files(tree):
+        parts.append(f"--- File: {relative_path} ---\n")
+        parts.append(read_file(file_path))
+        parts.append("\n\n")
+    context = "".join(parts)
+    del parts
+    key = hashlib.sha256(context.encode("utf-8")).hexdigest()
+    prompt = f"{context}\n\n{INSTRUCTIONS}"
+    return len(context), key, len(prompt)
+
+
+def assemble_builder(tree):
+    from docify_tool.generator import context_key
+    from docify_tool.scanner import get_project_context
+
+    context = get_project_context(tree)
+    key = context_key(context)
+    prompt = [context, INSTRUCTIONS]
+    return len(context), key, sum(len(part) for part in prompt)
+
+
+def measure(mode, tree):
+    """Run one assembly in this process and print its context size, peak RSS and time."""
+    import resource
+
+    start = time.perf_counter()
+    chars, _, _ = {"joined": assemble_joined, "builder": assemble_builder}[mode](tree)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != "darwin":  # ru_maxrss is in KiB on Linux, bytes on macOS
+        peak *= 1024
+    print(f"{mode:<8} context {chars / 2**20:>7.0f} MiB   peak RSS {peak / 2**20:>7.0f} MiB   "
+          f"{time.perf_counter() - start:>6.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=1024, help="Size of the generated tree (default: 1024).")
+    parser.add_argument("--tree", default=None, help="Use (or create) the tree in this directory.")
+    parser.add_argument("--keep", action="store_true", help="Keep a generated tree instead of deleting it.")
+    parser.add_argument("--measure", choices=["joined", "builder"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(args.measure, args.tree)
+        return
+
+    tree = args.tree or tempfile.mkdtemp(prefix="docify-bench-")
+    created = not os.path.isdir(tree) or not os.listdir(tree)
+    try:
+        if created:
+            print(f"Generating a {args.size_mb} MB tree in {tree}...")
+            generate_tree(tree, args.size_mb)
+        for mode in ("joined", "builder"):
+            subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--measure", mode, "--tree", tree],
+                env=dict(os.environ, PYTHONPATH=ROOT), check=True,
+            )
+    finally:
+        if created and not args.keep:
+            shutil.rmtree(tree, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+import os
+import json
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .helper import clean_fenced_content, loads_json_answer
+from .dataset_extractor import extract_and_summarize
+from .scanner import get_project_context, get_project_structure
+from .readme_sections import write_readme_incremental
+from .retrieval import retrieve_contexts
+from .prompts import docker_retrieval, gha_retrieval, model_card_retrieval
+from .sharded_tests import write_tests_sharded
+from .metrics import metrics
+
+# Artifact actions: (label, default output, generator method prefix).
+ARTIFACTS = {
+    "readme": ("README/docs", "README.md", "generate_readme"),
+    "test": ("pytest tests", ".", "generate_module_test"),  # one request per module, see sharded_tests
+    "docker": ("Dockerfile", "Dockerfile", "generate_dockerfile"),
+    "gha": ("GitHub Actions workflow", ".github/workflows/ci.yml", "generate_gha"),
+    "notebook": ("Jupyter Notebook", "notebook.ipynb", "generate_notebook"),
+    "model_card": ("Model Card", "MODEL_CARD.md", "generate_model_card"),
+}
+
+ALL_ARTIFACTS = ["readme", "test", "docker", "gha"]
+
+# Actions that get only the top-ranked files for their query instead of the full project context.
+RETRIEVAL = {
+    "docker": docker_retrieval,
+    "gha": gha_retrieval,
+    "model_card": model_card_retrieval,
+}
+
+
+def build_contexts(path, actions, ignore_dirs=None, ignore_exts=None, cache=None):
+    """
+    Scan a project once and build every context the selected artifacts need.
+
+    Returns:
+        dict: "project", "structure" and "dataset" contexts (unused ones are empty),
+        and "retrieved": action -> context of top-ranked files for RETRIEVAL actions.
+    """
+    print(f"Scanning project directory: {os.path.abspath(path)}")
+
+    contexts = {"project": "", "structure": "", "dataset": "", "retrieved": {}}
+    # Notebooks use the structure, per-module tests scan on their own.
+    if any(action not in ("notebook", "test") and action not in RETRIEVAL for action in actions):
+        contexts["project"] = get_project_context(
+            path,
+            ignore_dirs=ignore_dirs,
+            ignore_exts=ignore_exts,
+            cache=cache
+        )
+    specs = {action: RETRIEVAL[action] for action in actions if action in RETRIEVAL}
+    if specs:
+        contexts["retrieved"] = retrieve_contexts(path, specs, ignore_dirs, ignore_exts, cache)
+    if "notebook" in actions:
+        # Use lightweight structure for big-context tasks
+        contexts["structure"] = get_project_structure(path, ignore_dirs=ignore_dirs)
+
+    if not has_content(contexts):
+        return contexts
+
+    # --- Dataset and Schema Extraction (only for relevant tasks) ---
+    if "notebook" in actions or "model_card" in actions:
+        print("Scanning for datasets...")
+        # Extract datasets and generate LLM-friendly summary
+        contexts["dataset"] = extract_and_summarize(
+            project_path=path,
+            ignore_dirs=ignore_dirs
+        )
+
+        if contexts["dataset"]:
+            print("Datasets found.")
+        else:
+            print("No supported datasets found in the project.")
+
+    return contexts
+
+
+def has_content(contexts, actions=()):
+    """
+    Return True if a scan found anything to send to the model. A tests-only run
+    always proceeds: per-module test generation scans for modules itself.
+    """
+    if set(actions) == {"test"}:
+        return True
+    return any(
+        text.strip() for text in [contexts["project"], contexts["structure"]] + list(contexts.get("retrieved", {}).values())
+    )
+
+
+def artifact_output(action, output=None, several=False, base_dir=""):
+    """
+    Resolve the output path of an artifact. With several artifacts, `output` is a directory.
+    """
+    default = ARTIFACTS[action][1]
+    if not output:
+        path = default
+    elif several:
+        path = os.path.join(output, default)
+    else:
+        path = output
+    return os.path.join(base_dir, path) if base_dir else path
+
+
+def generate_artifacts(generator, client, actions, contexts, output=None, workers=4, base_dir="",
+                       scan=None, incremental=False, changed=None):
+    """
+    Generate the selected artifacts with a bounded worker pool, writing each as it completes.
+
+    `scan` describes the scan the contexts came from (root, ignore_dirs, ignore_exts,
+    cache); tests are generated per module from it, and with `incremental` the
+    README is updated section by section. `changed` (relative paths) limits per-module
+    tests to the modules those paths touch.
+
+    Returns:
+        list: dicts with the action, status, output path (or error), the paths of the
+        files written and elapsed seconds.
+    """
+    several = len(actions) > 1
+    summary = []
+    # Ask for a provider-side context cache only where several actions send the same context.
+    uses = Counter(
+        artifact_context(action, contexts) for action in actions
+        if action != "test" and not (action == "readme" and scan and incremental)
+    )
+
+    def task(action):
+        start = time.perf_counter()
+        output_path = artifact_output(action, output, several, base_dir)
+        try:
+            if action == "test":
+                written = write_tests_sharded(
+                    generator, client, output_dir=output_path, workers=workers, changed=changed, **scan
+                )
+            elif action == "readme" and scan and incremental:
+                written = write_readme_incremental(
+                    generator, client, project_context=contexts["project"],
+                    output_file=output_path, workers=workers, **scan
+                )
+                written = [written] if written else []
+            else:
+                shared = uses[artifact_context(action, contexts)] > 1
+                written = [write_artifact(generator, client, action, contexts, output_path, cache=shared)]
+            status = "ok"
+        except Exception as e:
+            print(f"Error generating {ARTIFACTS[action][0]}: {e}")
+            status, output_path, written = "failed", str(e), getattr(e, "written", [])
+        return {
+            "action": action,
+            "status": status,
+            "output": output_path,
+            "written": written,
+            "seconds": round(time.perf_counter() - start, 2),
+        }
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(actions)))) as pool:
+        for future in as_completed([pool.submit(task, action) for action in actions]):
+            summary.append(future.result())
+
+    return summary
+
+
+def print_summary(summary):
+    """
+    Print one line per generated artifact with its status and timing.
+    """
+    print("\nSummary:")
+    for item in summary:
+        print(f"  {item['action']:<12} {item['status']:<7} {item['seconds']:>7.2f}s  {item['output']}")
+
+
+def artifact_context(action, contexts):
+    """
+    Return the context `action` is generated from: its retrieved context if it has
+    one, the structure for notebooks and the project context otherwise.
+    """
+    if action == "notebook":
+        return contexts["structure"]
+    return contexts.get("retrieved", {}).get(action) or contexts["project"]
+
+
+def write_artifact(generator, client, action, contexts, output_file, cache=False):
+    """
+    Generate a single-file artifact and save it to `output_file`, which is returned.
+    Pass `cache` when other actions of the run send the same context.
+    """
+    label, _, method = ARTIFACTS[action]
+    print(f"Mode: Generating {label}...")
+
+    generate = getattr(generator, f"{method}_{client}")
+    project_context = artifact_context(action, contexts)
+    with metrics.span("generate", action=action):
+        if action == "notebook":
+            content = generate(project_context, contexts["dataset"])
+        elif action == "model_card":
+            content = generate(project_context, contexts["dataset"], cache=cache)
+        else:
+            content = generate(project_context, cache=cache)
+    content = notebook_json(generator, client, content) if action == "notebook" else clean_fenced_content(content)
+
+    with metrics.span("write", action=action, path=output_file):
+        if os.path.dirname(output_file):
+            os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write(content)
+    print(f"Successfully generated {label} at {output_file}")
+    return output_file
+
+
+def notebook_json(generator, client, content):
+    """
+    Return a generated notebook as valid JSON, repairing it locally and asking the
+    model to fix the syntax only if local repair fails.
+    """
+    try:
+        notebook, cut_off = loads_json_answer(content)
+    except ValueError:
+        print("Notebook JSON could not be repaired locally. Asking the model to correct the syntax...")
+        metrics.incr("retries")
+        with metrics.span("generate", action="fix_json"):
+            fixed = getattr(generator, f"fix_json_{client}")(content)
+        try:
+            notebook, cut_off = loads_json_answer(fixed)
+        except ValueError as e:
+            raise ValueError(f"The model could not fix the notebook JSON: {e}")
+    if cut_off:
+        print("Warning: the notebook was cut off in the model's output; its last cell ends early.")
+    return json.dumps(notebook, indent=1, ensure_ascii=False) + "\n"
@@ -0,0 +1,206 @@
+import os
+import json
+import time
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from .prompts import *
+from .helper import clean_fenced_content
+from .dataset_extractor import extract_and_summarize
+from .scanner import SPOOL_THRESHOLD, get_project_context
+from .generator import OPENAI_MODEL
+from .metrics import metrics
+
+# Artifacts that can be produced in batch mode: (system prompt, user prompt, default output file).
+BATCH_ARTIFACTS = {
+    "readme": (readme_system_prompt, readme_user_prompt, "README.md"),
+    "docker": (docker_system_prompt, docker_user_prompt, "Dockerfile"),
+    "gha": (gha_system_prompt, gha_user_prompt, ".github/workflows/ci.yml"),
+    "model_card": (model_card_system_prompt, model_card_user_prompt, "MODEL_CARD.md"),
+}
+
+OPENAI_BATCH_ENDPOINT = "/v1/chat/completions"
+OPENAI_BATCH_FINAL_STATES = ("completed", "failed", "expired", "cancelled")
+
+
+def build_batch_requests(roots, actions, ignore_dirs=None, ignore_exts=None, output=None):
+    """
+    Scan every project root once and build one generation request per root and action.
+
+    Roots without readable files are skipped with a warning.
+    """
+    requests = []
+
+    for index, root in enumerate(roots):
+        print(f"Scanning project directory: {os.path.abspath(root)}")
+        context = get_project_context(root, ignore_dirs=ignore_dirs, ignore_exts=ignore_exts)
+        if not context.strip():
+            print(f"Warning: No readable files found in {root}, skipping.")
+            continue
+
+        for action in actions:
+            system_prompt, user_prompt, default_output = BATCH_ARTIFACTS[action]
+            if action == "model_card":
+                user_prompt = user_prompt.format(
+                    dataset_context=extract_and_summarize(project_path=root, ignore_dirs=ignore_dirs)
+                )
+            if output and len(actions) > 1:
+                output_name = os.path.join(output, default_output)
+            else:
+                output_name = output or default_output
+
+            requests.append({
+                "custom_id": f"{index}-{action}-{os.path.basename(os.path.abspath(root))}",
+                "root": root,
+                "output": output_name,
+                "system_prompt": system_prompt,
+                "user_prompt": user_prompt,
+                "context": context,
+            })
+
+    return requests
+
+
+def run_openai_batch(generator, requests, poll_interval=30):
+    """
+    Submit all requests as one OpenAI Batch API job, wait for it and collect the results.
+
+    Returns:
+        dict: custom_id -> {"content": str} or {"error": str}.
+    """
+    client = generator.openai_client()
+
+    with metrics.span("batch_submit", provider="openai", requests=len(requests)):
+        # Each request line is encoded once into a file that spills to disk when large.
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_THRESHOLD, mode="w+b") as body:
+            for request in requests:
+                body.write(json.dumps({
+                    "custom_id": request["custom_id"],
+                    "method": "POST",
+                    "url": OPENAI_BATCH_ENDPOINT,
+                    "body": {
+                        "model": OPENAI_MODEL,
+                        "messages": generator._openai_messages(
+                            request["system_prompt"], request["user_prompt"], request["context"]
+                        ),
+                    },
+                }).encode("utf-8"))
+                body.write(b"\n")
+            body.seek(0)
+            batch_input = client.files.create(file=("docify_batch.jsonl", body), purpose="batch")
+        batch = client.batches.create(
+            input_file_id=batch_input.id,
+            endpoint=OPENAI_BATCH_ENDPOINT,
+            completion_window="24h",
+        )
+    print(f"Submitted batch {batch.id} with {len(requests)} requests.")
+
+    with metrics.span("batch_poll", provider="openai") as span:
+        polls = 0
+        while batch.status not in OPENAI_BATCH_FINAL_STATES:
+            time.sleep(poll_interval)
+            batch = client.batches.retrieve(batch.id)
+            polls += 1
+            print(f"Batch {batch.id} status: {batch.status}")
+        span.set(polls=polls, batch_status=batch.status)
+
+    results = {}
+    with metrics.span("batch_collect", provider="openai"):
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in client.files.content(file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                response = item.get("response") or {}
+                body = response.get("body") or {}
+                if item.get("error") or response.get("status_code") != 200:
+                    error = item.get("error") or body.get("error") or response
+                    results[item["custom_id"]] = {"error": str(error)}
+                    continue
+
+                usage = body.get("usage") or {}
+                generator._record_usage(
+                    "openai",
+                    usage.get("prompt_tokens"),
+                    (usage.get("prompt_tokens_details") or {}).get("cached_tokens"),
+                    usage.get("completion_tokens"),
+                )
+                results[item["custom_id"]] = {"content": body["choices"][0]["message"]["content"]}
+
+    for request in requests:
+        results.setdefault(request["custom_id"], {"error": f"No result returned (batch {batch.status})."})
+    return results
+
+
+def run_gemini_batch(generator, requests, workers=4):
+    """
+    Queue all requests through a bounded worker pool.
+
+    The Gemini SDK used here has no batch endpoint, so requests are drained
+    concurrently instead of one process per repository.
+
+    Returns:
+        dict: custom_id -> {"content": str} or {"error": str}.
+    """
+    def generate(request):
+        try:
+            content = generator._gemini_generate(
+                request["system_prompt"], request["user_prompt"], request["context"]
+            )
+            return request["custom_id"], {"content": content}
+        except Exception as e:
+            return request["custom_id"], {"error": str(e)}
+
+    with metrics.span("batch_queue", provider="gemini", requests=len(requests)):
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return dict(pool.map(generate, requests))
+
+
+def write_batch_results(requests, results):
+    """
+    Write each successful result to its output path inside its project root.
+
+    Returns:
+        list: (root, status) tuples, where status is the output path or an error message.
+    """
+    summary = []
+    with metrics.span("write", files=len(requests)):
+        for request in requests:
+            result = results[request["custom_id"]]
+            if "error" in result:
+                summary.append((request["root"], f"failed: {result['error']}"))
+                continue
+
+            out_path = os.path.join(request["root"], request["output"])
+            try:
+                os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+                with open(out_path, "w", encoding="utf-8") as f:
+                    f.write(clean_fenced_content(result["content"]))
+                summary.append((request["root"], out_path))
+            except Exception as e:
+                summary.append((request["root"], f"failed: {e}"))
+    return summary
+
+
+def run_batch(generator, client, roots, actions, output=None, ignore_dirs=None,
+              ignore_exts=None, poll_interval=30, workers=4):
+    """
+    Generate the selected artifacts for many project roots and fan the results back out.
+    """
+    requests = build_batch_requests(roots, actions, ignore_dirs, ignore_exts, output)
+    if not requests:
+        print("Warning: No readable project roots found for batch generation.")
+        return []
+
+    if client == "openai":
+        results = run_openai_batch(generator, requests, poll_interval=poll_interval)
+    else:
+        results = run_gemini_batch(generator, requests, workers=workers)
+
+    summary = write_batch_results(requests, results)
+    print("\nBatch summary:")
+    for root, status in summary:
+        print(f"  {root}: {status}")
+    return summary
@@ -1,11 +1,16 @@
 import os
 import argparse
-import json
 
 from .helper import clean_fenced_content
-from .dataset_extractor import extract_and_summarize
-from .scanner import get_project_context, get_project_structure
+from .artifacts import ARTIFACTS, ALL_ARTIFACTS, build_contexts, generate_artifacts, has_content, print_summary
+from .scanner import ScanCache
 from .generator import Generator
+from .batch import run_batch
+from .monorepo import DEFAULT_MARKERS, discover_roots, run_roots
+from .watch import WatchSession
+from .docstrings import add_docstrings_to_package
+from .metrics import metrics
+from .profiling import Profiler
 
 def main():
     """
@@ -15,6 +20,13 @@ def main():
         description="AI-Powered Project Documentation Tool",
         formatter_class=argparse.RawTextHelpFormatter
     )
+    parser.add_argument(
+        'command',
+        nargs='?',
+        choices=['watch'],
+        default=None,
+        help="'watch' keeps running and regenerates the selected artifacts when project files change."
+    )
     # --- General Configuration Arguments ---
     parser.add_argument(
         '--path', '-p',
@@ -41,10 +53,24 @@ def main():
         default=None,
         help='API key for your selected client (preferred over environment variable).'
     )
+    parser.add_argument(
+        '--metrics-json',
+        type=str,
+        default=None,
+        help='Write per-stage timings, byte/token counts and cache hits to this JSON file.'
+    )
+    parser.add_argument(
+        '--profile',
+        type=str,
+        default=None,
+        metavar='DIR',
+        help='Profile each stage (scan, dataset extraction, prompt assembly, generation, write) and write\n'
+             'cProfile .pstats files, a summary with top allocations and a stacks.folded flame graph input to DIR.'
+    )
     parser.add_argument(
         '--ignore-dirs',
         nargs='+',
-        default=['.git', '__pycache__', 'node_modules', '.vscode', 'venv', '.venv', 'dist', 'build', '.github'],
+        default=['.git', '__pycache__', 'node_modules', '.vscode', 'venv', '.venv', 'dist', 'build', '.github', '.docify'],
         help="A space-separated list of directory names to ignore."
     )
     parser.add_argument(
@@ -54,24 +80,125 @@ def main():
         help="A space-separated list of file extensions to ignore."
     )
 
-    # --- Mutually Exclusive Action Group ---
-    # Ensures only one of these primary actions can be run at a time.
-    action_group = parser.add_mutually_exclusive_group()
-    action_group.add_argument(
+    parser.add_argument(
+        '--batch',
+        nargs='+',
+        metavar='ROOT',
+        default=None,
+        help="Generate the selected artifacts (README, --docker, --gha, --model-card) for many\n"
+             "project roots in one provider batch job and write each result into its root."
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Regenerate only the README sections whose source files changed since the last run\n'
+             '(tracked in .docify/readme_map.json in the project root).'
+    )
+    parser.add_argument(
+        '--debounce',
+        type=float,
+        default=1.0,
+        help='In watch mode, seconds without further changes before regenerating (default: 1.0).'
+    )
+    parser.add_argument(
+        '--poll',
+        action='store_true',
+        help='In watch mode, detect changes by polling instead of inotify.'
+    )
+    parser.add_argument(
+        '--roots',
+        nargs='+',
+        metavar='ROOT',
+        default=None,
+        help='Generate the selected artifacts inside each of these project roots.'
+    )
+    parser.add_argument(
+        '--discover',
+        type=str,
+        metavar='DIR',
+        default=None,
+        help='Find project roots below DIR by marker files (see --markers) and process each one.'
+    )
+    parser.add_argument(
+        '--markers',
+        nargs='+',
+        default=DEFAULT_MARKERS,
+        help=f"Marker files identifying a project root for --discover (default: {' '.join(DEFAULT_MARKERS)})."
+    )
+    parser.add_argument(
+        '--root-workers',
+        type=int,
+        default=4,
+        help='Number of project roots processed concurrently with --roots/--discover (default: 4).'
+    )
+    parser.add_argument(
+        '--rpm',
+        type=float,
+        default=None,
+        help='Maximum LLM requests started per minute, shared by all workers (default: unlimited).'
+    )
+    parser.add_argument(
+        '--report',
+        type=str,
+        default=None,
+        help='Write a consolidated JSON report of timings, failures and tokens per root.'
+    )
+    parser.add_argument(
+        '--poll-interval',
+        type=float,
+        default=30,
+        help='Seconds between status checks of an OpenAI batch job (default: 30).'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=4,
+        help='Maximum number of concurrent LLM requests, across all artifacts, modules and roots (default: 4).'
+    )
+
+    # --- Artifact Actions ---
+    # Any combination of these can be requested; the project is scanned once and
+    # the selected artifacts are generated concurrently.
+    parser.add_argument(
+        '--readme',
+        action='store_true',
+        help='Generate README.md (the default when no other artifact is selected).'
+    )
+    parser.add_argument(
         '-t', '--test',
         action='store_true',
         help='Generate pytest test files.'
     )
-    action_group.add_argument(
+    parser.add_argument(
         '--docker',
         action='store_true',
         help='Generate a Dockerfile for this project.'
     )
-    action_group.add_argument(
+    parser.add_argument(
         '--gha',
         action='store_true',
         help='Generate a GitHub Actions workflow (CI/CD).'
     )
+    parser.add_argument(
+        '--notebook',
+        action='store_true',
+        help='Generate a starter Jupyter Notebook with analysis pipelines/tests.'
+    )
+    parser.add_argument(
+        '--model-card',
+        action='store_true',
+        help='Generate a Model Card (MODEL_CARD.md) for ML/AI projects.'
+    )
+
+    # --- Mutually Exclusive Action Group ---
+    # Ensures only one of these primary actions can be run at a time.
+    action_group = parser.add_mutually_exclusive_group()
+    action_group.add_argument(
+        '--all',
+        action='store_true',
+        help='Generate README.md, tests, Dockerfile and GitHub Actions workflow in one run\n'
+             '(together with any other artifact actions given, e.g. --all --model-card).'
+    )
     action_group.add_argument(
         '--init',
         type=str,
@@ -80,21 +207,44 @@ def main():
     action_group.add_argument(
         '--docstring',
         type=str,
-        help='Add docstrings to a given Python file (relative path).'
-    )
-    action_group.add_argument(
-        '--notebook',
-        action='store_true',
-        help='Generate a starter Jupyter Notebook with analysis pipelines/tests.'
-    )
-    action_group.add_argument(
-        '--model-card',
-        action='store_true',
-        help='Generate a Model Card (MODEL_CARD.md) for ML/AI projects.'
+        help='Add docstrings to a given Python file (relative path). Given a directory, only the\n'
+             'modules, classes and functions missing a docstring are documented, one request per symbol.'
     )
 
     args = parser.parse_args()
 
+    selected = any(getattr(args, action) for action in ARTIFACTS)
+    if (args.init or args.docstring) and selected:
+        parser.error("--init and --docstring cannot be combined with artifact actions.")
+    if args.command == 'watch' and (args.init or args.docstring or args.batch or args.roots or args.discover):
+        parser.error("watch cannot be combined with --init, --docstring, --batch, --roots or --discover.")
+    if (args.roots or args.discover) and (args.init or args.docstring or args.batch):
+        parser.error("--roots/--discover cannot be combined with --init, --docstring or --batch.")
+    if args.batch and (args.init or args.docstring or {"test", "notebook"} & set(selected_artifacts(args))):
+        parser.error("--batch supports the README, --docker, --gha and --model-card actions only.")
+
+    if args.metrics_json or args.profile:
+        metrics.reset(enabled=True)
+    if args.profile:
+        metrics.profiler = Profiler(args.profile).start()
+    try:
+        with metrics.span("run"):
+            run(args)
+    finally:
+        if args.metrics_json:
+            metrics.write_json(args.metrics_json)
+            print(f"Metrics written to {args.metrics_json}")
+        if args.profile:
+            metrics.profiler.stop()
+            metrics.profiler.write()
+            metrics.profiler = None
+            print(f"Profile written to {args.profile}")
+
+
+def run(args):
+    """
+    Execute the action selected by the parsed command-line arguments.
+    """
     # --- API key handling ---
     if args.client == 'gemini':
         api_key = args.key or os.getenv("GEMINI_API_KEY")
@@ -126,26 +276,51 @@ export OPENAI_API_KEY='your-secret-api-key'
             return
 
     # --- Initialize Generator ---
-    generator = Generator(api_key)
+    generator = Generator(api_key, rpm=args.rpm, workers=args.workers)
+    try:
+        run_actions(args, generator)
+    finally:
+        generator.release_cached_contents()
+
+
+def run_actions(args, generator):
+    """
+    Run the selected command with an initialized generator.
+    """
+    # --- Batch Generation across many project roots ---
+    if args.batch:
+        run_batch(
+            generator,
+            args.client,
+            args.batch,
+            selected_artifacts(args),
+            output=args.output,
+            ignore_dirs=args.ignore_dirs,
+            ignore_exts=args.ignore_exts,
+            poll_interval=args.poll_interval,
+            workers=args.workers,
+        )
+        return
 
     # --- Project Init ---
-        # --- Project Init ---
     if args.init:
         requirements = args.init
         project_root = os.path.abspath(args.path)  # Default: current working dir
         print(f"Bootstrapping Python project in {project_root} based on requirements: {requirements}")
 
-        if args.client == 'openai':
-            scaffold = generator.generate_project_init_openai(requirements)
-        else:
-            scaffold = generator.generate_project_init_gemini(requirements)
+        with metrics.span("generate", action="init"):
+            if args.client == 'openai':
+                scaffold = generator.generate_project_init_openai(requirements)
+            else:
+                scaffold = generator.generate_project_init_gemini(requirements)
 
         # Write scaffold files in current folder
-        for filepath, content in scaffold.items():
-            out_path = os.path.join(project_root, filepath)
-            os.makedirs(os.path.dirname(out_path), exist_ok=True)
-            with open(out_path, "w", encoding="utf-8") as f:
-                f.write(content)
+        with metrics.span("write", path=project_root, files=len(scaffold)):
+            for filepath, content in scaffold.items():
+                out_path = os.path.join(project_root, filepath)
+                os.makedirs(os.path.dirname(out_path), exist_ok=True)
+                with open(out_path, "w", encoding="utf-8") as f:
+                    f.write(content)
 
         print("\nProject scaffold generated successfully!")
         return
@@ -154,6 +329,17 @@ export OPENAI_API_KEY='your-secret-api-key'
     # --- Docstring Generation ---
     if args.docstring:
         file_path = args.docstring
+        if os.path.isdir(file_path):
+            add_docstrings_to_package(
+                generator,
+                args.client,
+                file_path,
+                ignore_dirs=args.ignore_dirs,
+                ignore_exts=args.ignore_exts,
+                workers=args.workers,
+            )
+            return
+
         if not os.path.exists(file_path):
             print(f"Error: File '{file_path}' not found.")
             return
@@ -162,185 +348,88 @@ export OPENAI_API_KEY='your-secret-api-key'
             code_content = f.read()
 
         print(f"Adding docstrings to {file_path}...")
-        if args.client == 'openai':
-            updated_code = generator.generate_docstring_openai(code_content)
-        else:
-            updated_code = generator.generate_docstring_gemini(code_content)
+        with metrics.span("generate", action="docstring"):
+            if args.client == 'openai':
+                updated_code = generator.generate_docstring_openai(code_content)
+            else:
+                updated_code = generator.generate_docstring_gemini(code_content)
 
         try:
-            cleaned = clean_fenced_content(updated_code)
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(cleaned)
+            with metrics.span("write", path=file_path):
+                cleaned = clean_fenced_content(updated_code)
+                with open(file_path, "w", encoding="utf-8") as f:
+                    f.write(cleaned)
             print(f"Docstrings successfully added to {file_path}")
         except Exception as e:
             print(f"Error saving updated file: {e}")
         return
 
-    # --- Scanning project context (for all remaining actions) ---
-    print(f"Scanning project directory: {os.path.abspath(args.path)}")
-
-    if args.notebook:
-        # Use lightweight structure for big-context tasks
-        project_context = get_project_structure(args.path, ignore_dirs=args.ignore_dirs)
-    else:
-        project_context = get_project_context(
-            args.path,
+    # --- Artifact generation (README, tests, Dockerfile, GHA, notebook, model card) ---
+    actions = selected_artifacts(args)
+
+    # --- Monorepo: many project roots sharing caches, clients and rate limits ---
+    roots = list(args.roots or [])
+    if args.discover:
+        roots.extend(discover_roots(args.discover, markers=args.markers, ignore_dirs=args.ignore_dirs))
+    if roots:
+        print(f"Processing {len(roots)} project roots...")
+        run_roots(
+            generator,
+            args.client,
+            roots,
+            actions,
+            output=args.output,
             ignore_dirs=args.ignore_dirs,
-            ignore_exts=args.ignore_exts
+            ignore_exts=args.ignore_exts,
+            root_workers=args.root_workers,
+            workers=args.workers,
+            report_path=args.report,
+            incremental=args.incremental,
         )
-
-    if not project_context.strip():
-        print("Warning: No readable files found in the specified directory.")
         return
-
-
-    # --- Dataset and Schema Extraction (only for relevant tasks) ---
-    dataset_context = ""
-    if args.notebook or args.model_card:
-        print("Scanning for datasets...")
-        # Extract datasets and generate LLM-friendly summary
-        dataset_context = extract_and_summarize(
-            project_path=args.path,
-            ignore_dirs=args.ignore_dirs
-        )
-
-        if dataset_context:
-            print("Datasets found.")
-        else:
-            print("No supported datasets found in the project.")
-
-
-    # --- Tests Generation ---
-    if args.test:
-        print("Mode: Generating pytest tests...")
-        if args.client == 'openai':
-            tests_json_str = generator.generate_test_openai(project_context)
-        else:
-            tests_json_str = generator.generate_test_gemini(project_context)
-
-        tests = None
-        try:
-            cleaned = clean_fenced_content(tests_json_str)
-            tests = json.loads(cleaned)
-
-        except json.JSONDecodeError:
-            print("Initial JSON parsing failed. Asking the model to correct the syntax...")
-
-            if args.client == 'openai':
-                fixed_json_str = generator.fix_json_openai(tests_json_str)
-            else:
-                fixed_json_str = generator.fix_json_gemini(tests_json_str)
-
-            try:
-                cleaned = clean_fenced_content(fixed_json_str)
-                tests = json.loads(cleaned)
-                print("Successfully parsed the corrected JSON.")
-            except json.JSONDecodeError as final_e:
-                print(f"Error: The model could not fix the JSON. Parsing failed again: {final_e}")
-                print("\n--- Raw output from model (for debugging) ---\n")
-                print(tests_json_str)
-                return
-
-        if tests:
-            try:
-                for filepath, content in tests.items():
-                    if not isinstance(content, str):
-                        print(f"Warning: Content for '{filepath}' is not a string, skipping.")
-                        continue
-
-                    out_path = os.path.join(args.output or ".", filepath)
-                    os.makedirs(os.path.dirname(out_path), exist_ok=True)
-                    with open(out_path, "w", encoding="utf-8") as f:
-                        f.write(content)
-                print("Successfully generated test files.")
-            except Exception as e:
-                print(f"Error writing test files to disk: {e}")
+    if args.discover:
+        print(f"Warning: No project roots with {', '.join(args.markers)} found in {args.discover}.")
         return
 
-# --- Dockerfile Generation ---
-    elif args.docker:
-        print("Mode: Generating Dockerfile...")
-        if args.client == 'openai':
-            docker_content = generator.generate_dockerfile_openai(project_context)
-        else:
-            docker_content = generator.generate_dockerfile_gemini(project_context)
-
-        output_file = args.output or "Dockerfile"
-        try:
-            with open(output_file, "w", encoding="utf-8") as f:
-                f.write(clean_fenced_content(docker_content))
-            print(f"Successfully generated Dockerfile at {output_file}")
-        except Exception as e:
-            print(f"Error saving Dockerfile: {e}")
-
-# --- Github action workflow config YAML Generation ---
-    elif args.gha:
-        print("Mode: Generating GitHub Actions workflow...")
-        if args.client == 'openai':
-            gha_content = generator.generate_gha_openai(project_context)
-        else:
-            gha_content = generator.generate_gha_gemini(project_context)
-
-        output_file = args.output or ".github/workflows/ci.yml"
-        try:
-            os.makedirs(os.path.dirname(output_file), exist_ok=True)
-            with open(output_file, "w", encoding="utf-8") as f:
-                f.write(clean_fenced_content(gha_content))
-            print(f"Successfully generated GitHub Actions workflow at {output_file}")
-        except Exception as e:
-            print(f"Error saving GitHub Actions workflow: {e}")
-
-    # --- Startup Notebook Generation ---
-    elif args.notebook:
-        print("Mode: Generating Jupyter Notebook...")
-
-        if args.client == 'openai':
-            nb_content = generator.generate_notebook_openai(project_context, dataset_context)
-        else:
-            nb_content = generator.generate_notebook_gemini(project_context, dataset_context)
-
-        output_file = args.output or "notebook.ipynb"
-        try:
-            with open(output_file, "w", encoding="utf-8") as f:
-                f.write(clean_fenced_content(nb_content))
-            print(f"Successfully generated Jupyter Notebook at {output_file}")
-        except Exception as e:
-            print(f"Error saving notebook: {e}")
-
-
-# --- Model Card Generation ---
-    elif args.model_card:
-        print("Mode: Generating Model Card...")
-
-        if args.client == 'openai':
-            mc_content = generator.generate_model_card_openai(project_context, dataset_context)
-        else:
-            mc_content = generator.generate_model_card_gemini(project_context, dataset_context)
+    # --- Watch mode: keep the index and clients warm, regenerate on changes ---
+    if args.command == 'watch':
+        WatchSession(
+            generator,
+            args.client,
+            args.path,
+            actions,
+            ignore_dirs=args.ignore_dirs,
+            ignore_exts=args.ignore_exts,
+            output=args.output,
+            workers=args.workers,
+            debounce=args.debounce,
+            force_polling=args.poll,
+        ).run()
+        return
 
-        output_file = args.output or "MODEL_CARD.md"
-        try:
-            with open(output_file, "w", encoding="utf-8") as f:
-                f.write(clean_fenced_content(mc_content))
-            print(f"Successfully generated Model Card at {output_file}")
-        except Exception as e:
-            print(f"Error saving Model Card: {e}")
+    # --- Scanning project context once for all selected artifacts ---
+    cache = ScanCache()
+    contexts = build_contexts(args.path, actions, args.ignore_dirs, args.ignore_exts, cache=cache)
+    if not has_content(contexts, actions):
+        print("Warning: No readable files found in the specified directory.")
+        return
 
+    scan = {"root": args.path, "ignore_dirs": args.ignore_dirs, "ignore_exts": args.ignore_exts, "cache": cache}
+    summary = generate_artifacts(
+        generator, args.client, actions, contexts, output=args.output, workers=args.workers,
+        scan=scan, incremental=args.incremental
+    )
+    if len(actions) > 1:
+        print_summary(summary)
 
-# --- Default Action: README/Docs Generation ---
-    else:
-        print("Mode: Generating README/docs...")
-        if args.client == 'openai':
-            readme_content = generator.generate_readme_openai(project_context)
-        else:
-            readme_content = generator.generate_readme_gemini(project_context)
 
-        output_file = args.output or "README.md"
-        try:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(clean_fenced_content(readme_content))
-            print(f"Successfully generated and saved to {output_file}")
-        except Exception as e:
-            print(f"Error saving README/docs: {e}")
+def selected_artifacts(args):
+    """
+    Return the artifact actions requested on the command line, README by default.
+    `--all` adds README, tests, Dockerfile and GHA workflow to any other selected action.
+    """
+    actions = [action for action in ARTIFACTS if getattr(args, action) or (args.all and action in ALL_ARTIFACTS)]
+    return actions or ["readme"]
 
 
 if __name__ == "__main__":
@@ -2,6 +2,8 @@ import os
 import csv
 import json
 
+from .metrics import metrics
+
 DATA_EXTS = [".csv", ".tsv", ".json", ".ndjson", ".parquet", ".xlsx", ".xls"]
 MAX_FIELD_LEN = 100  # max chars per field in sample
 MAX_LIST_ITEMS = 5   # max items in nested lists for JSON
@@ -138,25 +140,30 @@ def extract_and_summarize(project_path, ignore_dirs=None):
     ignore_dirs = set(ignore_dirs or [])
     dataset_info = {}
 
-    for root, dirs, files in os.walk(project_path):
-        dirs[:] = [d for d in dirs if d not in ignore_dirs]
-
-        for file in files:
-            ext = os.path.splitext(file)[1].lower()
-            if ext not in DATA_EXTS:
-                continue
-
-            file_path = os.path.join(root, file)
-            if ext == ".csv":
-                dataset_info[file] = extract_csv_tsv(file_path)
-            elif ext == ".tsv":
-                dataset_info[file] = extract_csv_tsv(file_path, sep="\t")
-            elif ext in [".json", ".ndjson"]:
-                dataset_info[file] = extract_json(file_path)
-            elif ext in [".parquet", ".xlsx", ".xls"]:
-                dataset_info[file] = {
-                    "path": file_path,
-                    "note": "Format detected but requires external library"
-                }
-
-    return summarize_datasets(dataset_info)
\ No newline at end of file
+    with metrics.span("dataset_extraction", root=project_path) as span:
+        for root, dirs, files in os.walk(project_path):
+            dirs[:] = [d for d in dirs if d not in ignore_dirs]
+
+            for file in files:
+                ext = os.path.splitext(file)[1].lower()
+                if ext not in DATA_EXTS:
+                    continue
+
+                file_path = os.path.join(root, file)
+                if ext == ".csv":
+                    dataset_info[file] = extract_csv_tsv(file_path)
+                elif ext == ".tsv":
+                    dataset_info[file] = extract_csv_tsv(file_path, sep="\t")
+                elif ext in [".json", ".ndjson"]:
+                    dataset_info[file] = extract_json(file_path)
+                elif ext in [".parquet", ".xlsx", ".xls"]:
+                    dataset_info[file] = {
+                        "path": file_path,
+                        "note": "Format detected but requires external library"
+                    }
+
+        summary = summarize_datasets(dataset_info)
+        span.set(datasets_found=len(dataset_info), summary_chars=len(summary))
+
+    metrics.incr("datasets_found", len(dataset_info))
+    return summary
@@ -0,0 +1,98 @@
+import os
+import ast
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .helper import clean_fenced_content
+from .python_source import find_missing_docstrings, format_docstring, insert_docstrings
+from .scanner import iter_project_files
+from .metrics import metrics
+
+
+def collect_symbols(root, ignore_dirs=None, ignore_exts=None):
+    """
+    Parse every Python file under `root` and list the symbols missing a docstring.
+
+    Returns:
+        dict: file path -> (source, symbols). Files without missing docstrings are left out.
+    """
+    files = {}
+    for relative_path, file_path in iter_project_files(root, ignore_dirs, ignore_exts):
+        if not file_path.endswith(".py"):
+            continue
+        try:
+            with open(file_path, "r", encoding="utf-8", newline="") as f:
+                source = f.read()
+            symbols = find_missing_docstrings(source)
+        except (SyntaxError, UnicodeDecodeError, ValueError) as e:
+            print(f"Skipping {relative_path}: {e}")
+            continue
+        if symbols:
+            files[file_path] = (source, symbols)
+    return files
+
+
+def add_docstrings_to_package(generator, client, root, ignore_dirs=None, ignore_exts=None, workers=4):
+    """
+    Add docstrings to every module, class and function under `root` that lacks one.
+
+    Each symbol is sent as a compact snippet in its own request; requests run
+    concurrently (bounded by `workers` and the generator's rate limiter), and the
+    returned docstrings are spliced in at their exact source positions. Only files
+    that still parse after splicing are written.
+
+    Returns:
+        list: paths of the files that were updated.
+    """
+    start = time.perf_counter()
+    generator = generator.fork()
+    with metrics.span("docstring_scan", root=root) as span:
+        files = collect_symbols(root, ignore_dirs, ignore_exts)
+        jobs = [(path, symbol) for path, (_, symbols) in files.items() for symbol in symbols]
+        span.set(files=len(files), symbols=len(jobs))
+
+    if not jobs:
+        print("All modules, classes and functions already have docstrings.")
+        return []
+    print(f"Generating docstrings for {len(jobs)} symbols in {len(files)} files...")
+
+    generate = getattr(generator, f"generate_symbol_docstring_{client}")
+
+    def task(job):
+        path, symbol = job
+        try:
+            text = clean_fenced_content(generate(symbol["snippet"], symbol["kind"], symbol["name"]))
+        except Exception as e:
+            print(f"Error generating docstring for {symbol['name'] or path}: {e}")
+            return path, symbol, None
+        return path, symbol, text
+
+    insertions = {}
+    with metrics.span("generate", action="docstring", symbols=len(jobs)):
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for path, symbol, text in pool.map(task, jobs):
+                if text:
+                    insertions.setdefault(path, []).append(
+                        (symbol["insert_line"], format_docstring(text, symbol["indent"]))
+                    )
+
+    updated = []
+    with metrics.span("write", action="docstring", files=len(insertions)):
+        for path, file_insertions in insertions.items():
+            new_source = insert_docstrings(files[path][0], file_insertions)
+            try:
+                ast.parse(new_source)
+            except SyntaxError as e:
+                print(f"Skipping {path}: inserted docstrings would break the file ({e}).")
+                continue
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                f.write(new_source)
+            updated.append(path)
+            print(f"Added {len(file_insertions)} docstrings to {os.path.relpath(path, root)}")
+
+    prompt_tokens = sum(usage["prompt_tokens"] for usage in generator.usage)
+    print(
+        f"Docstrings added to {len(updated)} files in {time.perf_counter() - start:.2f}s "
+        f"({prompt_tokens} prompt tokens sent)."
+    )
+    return updated
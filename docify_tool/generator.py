@@ -1,84 +1,347 @@
-import google.generativeai as genai
-from openai import OpenAI
+import copy
+import datetime
+import contextlib
+import hashlib
+import threading
+import time
+
 from .prompts import *
 from .helper import _parse_project_init_response
+from .metrics import metrics
+
+GEMINI_MODEL = "gemini-2.5-flash"
+OPENAI_MODEL = "gpt-4o"
+
+# Gemini refuses to cache contexts below a minimum size (1024 tokens for 2.5 Flash).
+GEMINI_CACHE_MIN_TOKENS = 1024
+GEMINI_CACHE_TTL = datetime.timedelta(minutes=5)
+GEMINI_CACHE_MARGIN = 30  # seconds before expiry from which a handle is no longer used
+GEMINI_CACHE_MAX_ENTRIES = 16  # live handles kept per generator; the oldest are deleted first
+HASH_CHUNK_CHARS = 1024 * 1024
+
+
+def _gemini_sdk():
+    """Import the Gemini SDK on first use so other commands never pay for it."""
+    import google.generativeai as genai
+    return genai
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token) used before a provider reports usage."""
+    return len(text) // 4
+
+
+def context_key(context: str) -> str:
+    """SHA-256 of a context, hashed in chunks so no full encoded copy is made."""
+    digest = hashlib.sha256()
+    for start in range(0, len(context), HASH_CHUNK_CHARS):
+        digest.update(context[start:start + HASH_CHUNK_CHARS].encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _delete_cached_content(cached):
+    """Delete a cached-content handle on the provider's side, ignoring failures (it may have expired)."""
+    if cached is None:
+        return
+    try:
+        cached.delete()
+    except Exception:
+        pass
+
+
+class RateLimiter:
+    """
+    Spaces out LLM requests so that at most `rpm` of them start in any minute.
+    A limiter without `rpm` never waits.
+    """
+
+    def __init__(self, rpm: float = None):
+        self.interval = 60.0 / rpm if rpm else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until the next request slot is available."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            metrics.incr("rate_limit_waits")
+            time.sleep(wait)
 
 
 class Generator:
     """
     A class-based interface for generating documentation, tests, Dockerfiles,
     GitHub Actions workflows, and project scaffolds using Google Gemini or OpenAI GPT models.
+
+    Prompts put the project context first and the action-specific instructions after
+    it, so every action run against the same project shares a prefix the provider can cache.
+    Callers pass `cache` when several requests of a run send the same context: Gemini
+    then stores it as cached content, OpenAI caches shared prefixes on its own.
     """
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache_context: bool = True, rpm: float = None, workers: int = None):
         """
         Initialize the DocifyAI instance with an API key.
 
         Args:
             api_key (str): API key for the respective AI provider.
+            cache_context (bool): Create a Gemini cached-content handle for large
+                project contexts shared by several actions and reuse it across them.
+            rpm (float): Maximum number of requests started per minute (unlimited if None).
+            workers (int): Maximum number of requests in flight at once, across every
+                thread and fork using this generator (unlimited if None).
         """
         self.api_key = api_key
+        self.cache_context = cache_context
+        self.rate_limiter = RateLimiter(rpm)
+        self.request_slots = threading.BoundedSemaphore(workers) if workers else contextlib.nullcontext()
+        self.usage = []
+        self._gemini_caches = {}  # context key -> (cached-content handle or None, monotonic expiry)
+        self._cache_locks = {}  # context key -> lock held while its handle is created
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def fork(self):
+        """
+        Return a generator that shares this one's clients, context caches, rate
+        limiter and request slots but records token usage separately (e.g. one per project root).
+        """
+        child = copy.copy(self)
+        child.usage = []
+        return child
+
+    def openai_client(self):
+        """Return the OpenAI client for this generator, creating it on first use."""
+        with self._lock:
+            if "openai" not in self._clients:
+                from openai import OpenAI
+                self._clients["openai"] = OpenAI(api_key=self.api_key)
+            return self._clients["openai"]
+
+    def _record_usage(self, provider: str, prompt_tokens, cached_tokens, output_tokens):
+        usage = {
+            "provider": provider,
+            "prompt_tokens": prompt_tokens or 0,
+            "cached_tokens": cached_tokens or 0,
+            "output_tokens": output_tokens or 0,
+        }
+        with self._lock:
+            self.usage.append(usage)
+        metrics.incr("llm_calls")
+        metrics.incr("prompt_tokens", usage["prompt_tokens"])
+        metrics.incr("cached_tokens", usage["cached_tokens"])
+        metrics.incr("output_tokens", usage["output_tokens"])
+        print(
+            f"Tokens: {usage['prompt_tokens']} prompt "
+            f"({usage['cached_tokens']} cached), {usage['output_tokens']} output"
+        )
+
+    def _gemini_cached_content(self, context: str):
+        """
+        Return a live cached-content handle for `context`, creating it on first use
+        and again once the previous one is about to expire.
+        """
+        if not self.cache_context or estimate_tokens(context) < GEMINI_CACHE_MIN_TOKENS:
+            return None
+
+        key = context_key(context)
+        with self._lock:
+            key_lock = self._cache_locks.setdefault(key, threading.Lock())
+        # Only requests for the same context wait for its handle; the create call runs
+        # without the generator-wide lock so other requests are not serialized behind it.
+        with key_lock:
+            with self._lock:
+                entry = self._gemini_caches.get(key)
+                if entry and time.monotonic() < entry[1]:
+                    metrics.incr("context_cache_hits")
+                    return entry[0]
+                expired = self._gemini_caches.pop(key, None)
+            if expired:
+                metrics.incr("context_cache_expired")
+                _delete_cached_content(expired[0])
+
+            metrics.incr("context_cache_misses")
+            try:
+                cached = _gemini_sdk().caching.CachedContent.create(
+                    model=f"models/{GEMINI_MODEL}",
+                    display_name=f"docify-{key[:12]}",
+                    system_instruction=context_system_prompt,
+                    contents=[context],
+                    ttl=GEMINI_CACHE_TTL,
+                )
+            except Exception as e:
+                print(f"Context caching unavailable, sending the full prompt instead: {e}")
+                cached = None
+            # A failed create is remembered for one TTL too, so it is not retried on every request.
+            expires = time.monotonic() + GEMINI_CACHE_TTL.total_seconds() - GEMINI_CACHE_MARGIN
+            with self._lock:
+                self._gemini_caches[key] = (cached, expires)
+                evicted = sorted(self._gemini_caches, key=lambda k: self._gemini_caches[k][1])
+                evicted = [self._gemini_caches.pop(k)[0] for k in evicted[:-GEMINI_CACHE_MAX_ENTRIES]]
+            for handle in evicted:
+                _delete_cached_content(handle)
+            return cached
+
+    def _discard_cached_content(self, cached):
+        """Forget and delete a handle the provider no longer accepts."""
+        with self._lock:
+            keys = [key for key, entry in self._gemini_caches.items() if entry[0] is cached]
+            for key in keys:
+                del self._gemini_caches[key]
+        _delete_cached_content(cached)
 
-    def _gemini_generate(self, system_prompt: str, user_prompt: str, context: str) -> str:
+    def release_cached_contents(self):
+        """Delete every cached-content handle this generator (and its forks) created."""
+        with self._lock:
+            handles = [entry[0] for entry in self._gemini_caches.values()]
+            self._gemini_caches.clear()
+        for handle in handles:
+            _delete_cached_content(handle)
+
+    def _prompt_span(self, provider: str, system_prompt: str, user_prompt: str, context: str):
+        prompt_chars = len(system_prompt) + len(user_prompt) + len(context)
+        metrics.incr("prompt_chars", prompt_chars)
+        return metrics.span(
+            "llm",
+            provider=provider,
+            prompt_chars=prompt_chars,
+            estimated_tokens=prompt_chars // 4,
+        )
+
+    def _gemini_generate(self, system_prompt: str, user_prompt: str, context: str, cache: bool = False) -> str:
+        """
+        Generate with Gemini. With `cache`, a large context is stored as cached
+        content once and reused by every later request with the same context;
+        pass it only for contexts that several actions share.
+        """
+        genai = _gemini_sdk()
         genai.configure(api_key=self.api_key)
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        prompt = f"{system_prompt}\n\n{user_prompt}\n\n{context}"
-        response = model.generate_content(prompt)
+        with self.request_slots:
+            self.rate_limiter.acquire()
+            with self._prompt_span("gemini", system_prompt, user_prompt, context):
+                cached = self._gemini_cached_content(context) if cache and context else None
+                instructions = f"{system_prompt}\n\n{user_prompt}"
+                response = None
+                if cached is not None:
+                    try:
+                        with metrics.span("prompt", provider="gemini"):
+                            model = genai.GenerativeModel.from_cached_content(cached_content=cached)
+                        response = model.generate_content(instructions)
+                    except Exception as e:
+                        # Expired or deleted on the provider's side: send the context inline instead.
+                        print(f"Cached context unusable, sending the full prompt instead: {e}")
+                        metrics.incr("context_cache_failures")
+                        self._discard_cached_content(cached)
+                if response is None:
+                    with metrics.span("prompt", provider="gemini"):
+                        model = genai.GenerativeModel(GEMINI_MODEL, system_instruction=context_system_prompt)
+                        # Separate parts: the context string is sent as is, never concatenated.
+                        prompt = [context, instructions] if context else instructions
+                    response = model.generate_content(prompt)
+
+        usage = getattr(response, "usage_metadata", None)
+        self._record_usage(
+            "gemini",
+            getattr(usage, "prompt_token_count", 0),
+            getattr(usage, "cached_content_token_count", 0),
+            getattr(usage, "candidates_token_count", 0),
+        )
         return response.text
 
+    def _openai_messages(self, system_prompt: str, user_prompt: str, context: str) -> list:
+        messages = [{"role": "system", "content": context_system_prompt}]
+        if context:
+            messages.append({"role": "user", "content": context})
+        messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": user_prompt})
+        return messages
+
     def _openai_generate(self, system_prompt: str, user_prompt: str, context: str) -> str:
-        client = OpenAI(api_key=self.api_key)
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"{user_prompt}\n\n{context}"},
-            ],
+        client = self.openai_client()
+        with self.request_slots:
+            self.rate_limiter.acquire()
+            with self._prompt_span("openai", system_prompt, user_prompt, context):
+                with metrics.span("prompt", provider="openai"):
+                    messages = self._openai_messages(system_prompt, user_prompt, context)
+                response = client.chat.completions.create(model=OPENAI_MODEL, messages=messages)
+
+        usage = getattr(response, "usage", None)
+        details = getattr(usage, "prompt_tokens_details", None)
+        self._record_usage(
+            "openai",
+            getattr(usage, "prompt_tokens", 0),
+            getattr(details, "cached_tokens", 0),
+            getattr(usage, "completion_tokens", 0),
         )
         return response.choices[0].message.content
 
-    def generate_readme_gemini(self, project_context: str) -> str:
+    def generate_readme_gemini(self, project_context: str, cache: bool = False) -> str:
         print("Docify-AI is analyzing the project and writing the DOCS...")
-        return self._gemini_generate(readme_system_prompt, readme_user_prompt, project_context)
+        return self._gemini_generate(readme_system_prompt, readme_user_prompt, project_context, cache=cache)
 
-    def generate_readme_openai(self, project_context: str) -> str:
+    def generate_readme_openai(self, project_context: str, cache: bool = False) -> str:
         print("Docify-AI is analyzing the project and writing the DOCS...")
         return self._openai_generate(readme_system_prompt, readme_user_prompt, project_context)
 
-    def generate_test_gemini(self, project_context: str) -> str:
-        print("Docify-AI is analyzing the project and writing the Tests...")
-        return self._gemini_generate(test_system_prompt, test_user_prompt, project_context)
+    def generate_readme_section_gemini(self, project_context: str, section: str) -> str:
+        return self._gemini_generate(
+            readme_section_system_prompt,
+            readme_section_user_prompt.format(section=section),
+            project_context
+        )
 
-    def generate_test_openai(self, project_context: str) -> str:
-        print("Docify-AI is analyzing the project and writing the tests...")
-        return self._openai_generate(test_system_prompt, test_user_prompt, project_context)
+    def generate_readme_section_openai(self, project_context: str, section: str) -> str:
+        return self._openai_generate(
+            readme_section_system_prompt,
+            readme_section_user_prompt.format(section=section),
+            project_context
+        )
 
-    def generate_dockerfile_gemini(self, project_context: str) -> str:
+    def generate_module_test_gemini(self, module_context: str, module: str, path: str) -> str:
+        return self._gemini_generate(
+            test_module_system_prompt,
+            test_module_user_prompt.format(module=module, path=path),
+            module_context
+        )
+
+    def generate_module_test_openai(self, module_context: str, module: str, path: str) -> str:
+        return self._openai_generate(
+            test_module_system_prompt,
+            test_module_user_prompt.format(module=module, path=path),
+            module_context
+        )
+
+    def generate_dockerfile_gemini(self, project_context: str, cache: bool = False) -> str:
         print("Docify-AI is analyzing the project and writing the Dockerfile...")
-        return self._gemini_generate(docker_system_prompt, docker_user_prompt, project_context)
+        return self._gemini_generate(docker_system_prompt, docker_user_prompt, project_context, cache=cache)
 
-    def generate_dockerfile_openai(self, project_context: str) -> str:
+    def generate_dockerfile_openai(self, project_context: str, cache: bool = False) -> str:
         print("Docify-AI is analyzing the project and writing the Dockerfile...")
         return self._openai_generate(docker_system_prompt, docker_user_prompt, project_context)
 
-    def generate_gha_gemini(self, project_context: str) -> str:
+    def generate_gha_gemini(self, project_context: str, cache: bool = False) -> str:
         print("Docify-AI is analyzing the project and writing the GitHub Actions workflow...")
-        return self._gemini_generate(gha_system_prompt, gha_user_prompt, project_context)
+        return self._gemini_generate(gha_system_prompt, gha_user_prompt, project_context, cache=cache)
 
-    def generate_gha_openai(self, project_context: str) -> str:
+    def generate_gha_openai(self, project_context: str, cache: bool = False) -> str:
         print("Docify-AI is analyzing the project and writing the GitHub Actions workflow...")
         return self._openai_generate(gha_system_prompt, gha_user_prompt, project_context)
 
     def generate_project_init_gemini(self, project_name: str) -> dict:
         print("Docify-AI is creating a new Python project scaffold...")
         content = self._gemini_generate(init_system_prompt, init_user_prompt, project_name)
-        return _parse_project_init_response(content)
+        return _parse_project_init_response(content, fix_json=self.fix_json_gemini)
 
     def generate_project_init_openai(self, project_name: str) -> dict:
         print("Docify-AI is creating a new Python project scaffold...")
         content = self._openai_generate(init_system_prompt, init_user_prompt, project_name)
-        return _parse_project_init_response(content)
-    
+        return _parse_project_init_response(content, fix_json=self.fix_json_openai)
+
     def generate_docstring_gemini(self, project_context: str) -> str:
         print("Docify-AI is adding docstrings with Gemini...")
         return self._gemini_generate(docstring_system_prompt, docstring_user_prompt, project_context)
@@ -87,49 +350,54 @@ class Generator:
     def generate_docstring_openai(self, project_context: str) -> str:
         print("Docify-AI is adding docstrings with OpenAI...")
         return self._openai_generate(docstring_system_prompt, docstring_user_prompt, project_context)
-    
+
+    def generate_symbol_docstring_gemini(self, snippet: str, kind: str, name: str) -> str:
+        return self._gemini_generate(
+            symbol_docstring_system_prompt,
+            symbol_docstring_user_prompt.format(kind=kind, name=f"`{name}`" if name else ""),
+            snippet
+        )
+
+    def generate_symbol_docstring_openai(self, snippet: str, kind: str, name: str) -> str:
+        return self._openai_generate(
+            symbol_docstring_system_prompt,
+            symbol_docstring_user_prompt.format(kind=kind, name=f"`{name}`" if name else ""),
+            snippet
+        )
+
     def generate_notebook_gemini(self, project_context: str, dataset_context: str) -> str:
         print("Docify-AI is generating a Jupyter Notebook with Gemini...")
         return self._gemini_generate(
             notebook_system_prompt,
-            notebook_user_prompt.format(
-                project_context=project_context,
-                dataset_context=dataset_context
-            ),
-            ""
+            notebook_user_prompt.format(dataset_context=dataset_context),
+            project_context
         )
 
     def generate_notebook_openai(self, project_context: str, dataset_context: str) -> str:
         print("Docify-AI is generating a Jupyter Notebook with OpenAI...")
         return self._openai_generate(
             notebook_system_prompt,
-            notebook_user_prompt.format(
-                project_context=project_context,
-                dataset_context=dataset_context
-            ),
-            ""
+            notebook_user_prompt.format(dataset_context=dataset_context),
+            project_context
         )
 
-    def generate_model_card_gemini(self, project_context: str, dataset_context: str) -> str:
+    def generate_model_card_gemini(self, project_context: str, dataset_context: str,
+                                  cache: bool = False) -> str:
         print("Docify-AI is generating a MODEL_CARD.md with Gemini...")
         return self._gemini_generate(
             model_card_system_prompt,
-            model_card_user_prompt.format(
-                project_context=project_context,
-                dataset_context=dataset_context
-            ),
-            ""
+            model_card_user_prompt.format(dataset_context=dataset_context),
+            project_context,
+            cache=cache
         )
 
-    def generate_model_card_openai(self, project_context: str, dataset_context: str) -> str:
+    def generate_model_card_openai(self, project_context: str, dataset_context: str,
+                                  cache: bool = False) -> str:
         print("Docify-AI is generating a MODEL_CARD.md with OpenAI...")
         return self._openai_generate(
             model_card_system_prompt,
-            model_card_user_prompt.format(
-                project_context=project_context,
-                dataset_context=dataset_context
-            ),
-            ""
+            model_card_user_prompt.format(dataset_context=dataset_context),
+            project_context
         )
 
     def fix_json_gemini(self, broken_json_string: str) -> str:
@@ -149,5 +417,3 @@ class Generator:
             user_prompt=broken_json_string,
             context=""
         )
-
-
@@ -1,21 +1,142 @@
 import json
 import re
 
-def _parse_project_init_response(raw_text):
+def _parse_project_init_response(raw_text, fix_json=None):
     """
     Parse AI response for project init into a dict {filepath: content}.
+
+    The answer is repaired locally first; `fix_json` (a model call) is only used
+    when that fails. A file cut off by truncated output is left out.
     """
     try:
-        cleaned = raw_text.strip()
-        cleaned = re.sub(r"^```(?:json)?", "", cleaned)
-        cleaned = re.sub(r"```$", "", cleaned)
-        cleaned = cleaned.strip()
-        return json.loads(cleaned)
+        try:
+            files, cut_off = loads_json_answer(raw_text)
+        except ValueError:
+            if fix_json is None:
+                raise
+            print("Local JSON repair failed. Asking the model to correct the syntax...")
+            files, cut_off = loads_json_answer(fix_json(raw_text))
+        if not isinstance(files, dict):
+            raise ValueError("expected a JSON object of file paths")
     except Exception as e:
         print("⚠️ Error parsing AI project scaffold response:", e)
         print("Raw output:\n", raw_text)
         return {}
-    
+
+    if cut_off and files:
+        last = list(files)[-1]
+        print(f"⚠️ '{last}' was cut off in the model's output, skipping.")
+        del files[last]
+    for filepath in [path for path, content in files.items() if not isinstance(content, str)]:
+        print(f"⚠️ Content for '{filepath}' is not a string, skipping.")
+        del files[filepath]
+    return files
+
+
+def repair_json(text: str) -> str:
+    """
+    Deterministically repair the usual ways a model breaks a JSON answer:
+    code fences and prose around the value, trailing commas, and output cut off
+    mid-string or mid-object (the open string and brackets are closed).
+
+    Raw newlines and tabs inside strings are left in place; parse the result
+    with json.loads(..., strict=False) to accept them.
+
+    Raises:
+        ValueError: if no JSON object or array can be recovered.
+    """
+    return _repair_json(text)[0]
+
+
+def _repair_json(text):
+    """repair_json(), also reporting whether the output ended inside a string value."""
+    text = text or ""
+    # Prefer a value that starts a line, so brackets in leading prose are skipped.
+    match = re.search(r"^[ \t]*[{\[]", text, re.MULTILINE) or re.search(r"[{\[]", text)
+    if not match:
+        raise ValueError("No JSON object or array found.")
+
+    out = []
+    stack = []
+    in_string = False
+    escape = False
+    for ch in text[match.end() - 1:]:
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]":
+            _drop_trailing_comma(out)
+            if not stack or stack[-1] != ch:
+                raise ValueError(f"Unbalanced '{ch}' in JSON.")
+            stack.pop()
+            if not stack:
+                out.append(ch)
+                break  # anything after the top-level value is prose or a closing fence
+        out.append(ch)
+
+    if not stack:
+        return "".join(out), False
+
+    # Truncated output: finish the open string, drop a dangling key, close the brackets.
+    repaired = "".join(out)
+    cut_off = in_string
+    if in_string:
+        if escape:
+            repaired = repaired[:-1]
+        partial = re.search(r"(\\*)\\u[0-9a-fA-F]{0,3}$", repaired)
+        if partial and len(partial.group(1)) % 2 == 0:
+            repaired = repaired[:partial.start() + len(partial.group(1))]
+        repaired += '"'
+    repaired = repaired.rstrip()
+    if stack[-1] == "}" and re.search(r'[{,]\s*"(?:[^"\\]|\\.)*"\s*:?$', repaired):
+        repaired = re.sub(r',?\s*"(?:[^"\\]|\\.)*"\s*:?$', "", repaired)
+        cut_off = False  # the open string was a key, and it is gone
+    elif repaired.endswith(":"):
+        repaired += " null"
+    repaired = repaired.rstrip()
+    if repaired.endswith(","):
+        repaired = repaired[:-1]
+    return repaired + "".join(reversed(stack)), cut_off
+
+
+def _drop_trailing_comma(out):
+    """Remove a trailing comma (and the whitespace after it) from a list of characters."""
+    end = len(out)
+    while end and out[end - 1].isspace():
+        end -= 1
+    if end and out[end - 1] == ",":
+        del out[end - 1:]
+
+
+def loads_json_answer(text: str):
+    """
+    Parse a model's JSON answer, repairing it locally when plain parsing fails.
+
+    Returns:
+        tuple: (value, cut_off). cut_off is True when the answer was cut off inside
+        a string value, so the last string value ends early.
+
+    Raises:
+        ValueError: if the text cannot be parsed even after repair.
+    """
+    try:
+        return json.loads(clean_fenced_content(text)), False
+    except ValueError:
+        pass
+    repaired, cut_off = _repair_json(text)
+    return json.loads(repaired, strict=False), cut_off
+
 
 import re
 
@@ -39,4 +160,3 @@ def clean_fenced_content(content: str) -> str:
         lines = lines[:-1]
 
     return "\n".join(lines).strip()
-
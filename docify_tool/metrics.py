@@ -0,0 +1,119 @@
+import json
+import threading
+import time
+
+
+class _NullSpan:
+    """Span returned while metrics are disabled; every operation is a no-op."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """Times one stage of a run and stores it on the owning Metrics instance."""
+
+    def __init__(self, metrics, name, attrs):
+        self.metrics = metrics
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        if self.metrics.profiler:
+            self.metrics.profiler.enter(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        if self.metrics.profiler:
+            self.metrics.profiler.exit(self.name)
+        record = {
+            "name": self.name,
+            "start": round(self.start - self.metrics.started_at, 6),
+            "seconds": round(end - self.start, 6),
+            "status": "error" if exc_type else "ok",
+        }
+        record.update(self.attrs)
+        with self.metrics._lock:
+            self.metrics.spans.append(record)
+        return False
+
+    def set(self, **attrs):
+        """Attach extra attributes (counts, sizes) to the span."""
+        self.attrs.update(attrs)
+
+
+class Metrics:
+    """
+    Collects span timings and counters for a docify run.
+
+    A disabled instance hands out a shared no-op span and ignores counters, so the
+    instrumentation left in the pipeline costs one attribute check per call.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.started_at = time.perf_counter()
+        self.spans = []
+        self.counters = {}
+        self.profiler = None  # set by --profile; spans then enter and leave its stages
+        self._lock = threading.Lock()
+
+    def reset(self, enabled: bool = True):
+        """Clear recorded data and switch collection on or off."""
+        with self._lock:
+            self.enabled = enabled
+            self.started_at = time.perf_counter()
+            self.spans = []
+            self.counters = {}
+
+    def span(self, name: str, **attrs):
+        """Return a context manager timing the stage `name`."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, attrs)
+
+    def incr(self, name: str, value=1):
+        """Add `value` to the counter `name`."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def report(self) -> dict:
+        """Return the collected data as a JSON-serialisable dict."""
+        with self._lock:
+            spans = list(self.spans)
+            counters = dict(self.counters)
+
+        stages = {}
+        for span in spans:
+            stage = stages.setdefault(span["name"], {"count": 0, "seconds": 0.0})
+            stage["count"] += 1
+            stage["seconds"] = round(stage["seconds"] + span["seconds"], 6)
+
+        return {
+            "total_seconds": round(time.perf_counter() - self.started_at, 6),
+            "stages": stages,
+            "counters": counters,
+            "spans": spans,
+        }
+
+    def write_json(self, path: str):
+        """Write the report to `path`."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+
+
+# Process-wide recorder used by the scanner, dataset extractor, generator and CLI.
+metrics = Metrics()
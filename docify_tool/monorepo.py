@@ -0,0 +1,111 @@
+import os
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .artifacts import build_contexts, generate_artifacts, has_content
+from .scanner import ScanCache
+from .metrics import metrics
+
+DEFAULT_MARKERS = ["pyproject.toml", "setup.py", "package.json"]
+
+
+def discover_roots(base_dir, markers=None, ignore_dirs=None):
+    """
+    Find project roots below `base_dir`: every directory containing one of the marker files.
+
+    Nested roots (e.g. services inside a monorepo that has its own pyproject.toml) are all returned.
+    """
+    markers = set(markers or DEFAULT_MARKERS)
+    ignore_dirs = set(ignore_dirs or [])
+    roots = []
+
+    for dirpath, dirnames, filenames in os.walk(base_dir):
+        dirnames[:] = sorted(d for d in dirnames if d not in ignore_dirs)
+        if markers.intersection(filenames):
+            roots.append(dirpath)
+
+    return roots
+
+
+def process_root(generator, client, root, actions, output=None, ignore_dirs=None,
+                 ignore_exts=None, workers=4, cache=None, incremental=False):
+    """
+    Scan one project root and generate the selected artifacts inside it.
+
+    Returns:
+        dict: the root's report entry (status, timing, artifacts and token usage).
+    """
+    start = time.perf_counter()
+    root_generator = generator.fork()
+    entry = {"root": root, "status": "ok", "artifacts": []}
+
+    try:
+        with metrics.span("root", root=root):
+            contexts = build_contexts(root, actions, ignore_dirs, ignore_exts, cache=cache)
+            if not has_content(contexts, actions):
+                entry["status"] = "skipped"
+                entry["error"] = "No readable files found."
+            else:
+                entry["artifacts"] = generate_artifacts(
+                    root_generator, client, actions, contexts,
+                    output=output, workers=workers, base_dir=root,
+                    scan={"root": root, "ignore_dirs": ignore_dirs, "ignore_exts": ignore_exts, "cache": cache},
+                    incremental=incremental
+                )
+                if any(item["status"] != "ok" for item in entry["artifacts"]):
+                    entry["status"] = "failed"
+    except Exception as e:
+        entry["status"] = "failed"
+        entry["error"] = str(e)
+
+    entry["seconds"] = round(time.perf_counter() - start, 2)
+    entry["tokens"] = {
+        key: sum(usage[key] for usage in root_generator.usage)
+        for key in ("prompt_tokens", "cached_tokens", "output_tokens")
+    }
+    return entry
+
+
+def run_roots(generator, client, roots, actions, output=None, ignore_dirs=None,
+              ignore_exts=None, root_workers=4, workers=4, report_path=None, incremental=False):
+    """
+    Process many project roots through a thread pool that shares one scan cache,
+    one set of LLM clients and one rate limiter, then write a consolidated report.
+    """
+    start = time.perf_counter()
+    cache = ScanCache()
+
+    def task(root):
+        return process_root(
+            generator, client, root, actions, output=output, ignore_dirs=ignore_dirs,
+            ignore_exts=ignore_exts, workers=workers, cache=cache, incremental=incremental
+        )
+
+    with ThreadPoolExecutor(max_workers=max(1, root_workers)) as pool:
+        entries = list(pool.map(task, roots))
+
+    report = {
+        "total_seconds": round(time.perf_counter() - start, 2),
+        "roots": entries,
+        "failures": sum(1 for entry in entries if entry["status"] == "failed"),
+        "tokens": {
+            key: sum(entry["tokens"][key] for entry in entries)
+            for key in ("prompt_tokens", "cached_tokens", "output_tokens")
+        },
+    }
+
+    print("\nRoots summary:")
+    for entry in entries:
+        print(
+            f"  {entry['status']:<7} {entry['seconds']:>7.2f}s  "
+            f"{entry['tokens']['prompt_tokens']:>8} tokens  {entry['root']}"
+        )
+    print(f"{len(entries)} roots in {report['total_seconds']:.2f}s, {report['failures']} failed.")
+
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {report_path}")
+
+    return report
@@ -0,0 +1,201 @@
+import io
+import os
+import sys
+import time
+import pstats
+import cProfile
+import threading
+import tracemalloc
+
+# Metrics span name -> profiled stage. Spans not listed here are not profiled on their own.
+PROFILE_STAGES = {
+    "scan": "scan",
+    "scan_structure": "scan",
+    "test_shards": "scan",
+    "docstring_scan": "scan",
+    "index": "scan",
+    "retrieve": "prompt",
+    "dataset_extraction": "dataset",
+    "prompt": "prompt",
+    "generate": "generate",
+    "llm": "generate",
+    "write": "write",
+}
+
+SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+TOP_FUNCTIONS = 25
+TOP_ALLOCATIONS = 15
+
+
+class Profiler:
+    """
+    Profiles the stages of a run (scan, dataset extraction, prompt assembly,
+    generation, write) with cProfile and tracemalloc, and samples every thread's
+    stack for flame graphs.
+
+    Stages are entered and left through metrics spans. cProfile only sees the
+    thread it was enabled in, so each stage entry gets its own profile, and a
+    nested stage pauses the enclosing one: time is attributed to the innermost
+    stage. Allocation deltas are process-wide, so with concurrent stages they
+    also include other threads' allocations.
+    """
+
+    def __init__(self, directory, sample_interval=SAMPLE_INTERVAL):
+        self.directory = directory
+        self.sample_interval = sample_interval
+        self.stages = {}
+        self.samples = {}
+        self._local = threading.local()
+        self._active = {}  # thread id -> stage, for labelling stack samples
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def start(self):
+        """Start tracemalloc and the stack sampler."""
+        tracemalloc.start()
+        self._sampler = threading.Thread(target=self._sample, name="docify-profiler", daemon=True)
+        self._sampler.start()
+        return self
+
+    def stop(self):
+        """Stop sampling and tracing."""
+        self._stop.set()
+        if self._sampler:
+            self._sampler.join()
+        self.peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    def _stage(self, stage):
+        with self._lock:
+            return self.stages.setdefault(stage, {
+                "count": 0, "seconds": 0.0, "unprofiled": 0, "profiles": [], "allocations": {},
+            })
+
+    def enter(self, span_name):
+        """Start profiling the stage of `span_name` in the calling thread."""
+        stage = PROFILE_STAGES.get(span_name)
+        if stage is None:
+            return
+        stack = self._local.__dict__.setdefault("stack", [])
+        if stack and stack[-1]["stage"] == stage:
+            stack.append({"stage": stage, "owner": False, "profile": stack[-1]["profile"]})  # same stage continues
+            return
+        if stack and stack[-1]["profile"]:
+            stack[-1]["profile"].disable()
+
+        # Snapshot first, so the stage's time and profile do not include the snapshot's own cost.
+        snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        profile = cProfile.Profile()
+        entry = {"stage": stage, "owner": True, "profile": profile, "snapshot": snapshot,
+                 "start": time.perf_counter()}
+        try:
+            profile.enable()
+        except ValueError:  # Python 3.12+: another thread is already being profiled
+            entry["profile"] = None
+        stack.append(entry)
+        self._active[threading.get_ident()] = stage
+
+    def exit(self, span_name):
+        """Stop profiling the stage entered by the matching enter() call."""
+        if PROFILE_STAGES.get(span_name) is None:
+            return
+        stack = self._local.__dict__.get("stack")
+        if not stack:
+            return
+        entry = stack.pop()
+        if not entry["owner"]:
+            return
+        if entry["profile"]:
+            entry["profile"].disable()
+        seconds = time.perf_counter() - entry["start"]
+        diff = []
+        if entry["snapshot"] is not None and tracemalloc.is_tracing():
+            own = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+            diff = tracemalloc.take_snapshot().filter_traces(own).compare_to(
+                entry["snapshot"].filter_traces(own), "lineno"
+            )[:TOP_ALLOCATIONS]
+
+        data = self._stage(entry["stage"])
+        with self._lock:
+            data["count"] += 1
+            data["seconds"] += seconds
+            if entry["profile"]:
+                data["profiles"].append(entry["profile"])
+            else:
+                data["unprofiled"] += 1
+            for stat in diff:
+                frame = stat.traceback[0]
+                key = f"{frame.filename}:{frame.lineno}"
+                size, count = data["allocations"].get(key, (0, 0))
+                data["allocations"][key] = (size + stat.size_diff, count + stat.count_diff)
+
+        if stack:
+            self._active[threading.get_ident()] = stack[-1]["stage"]
+            if stack[-1]["profile"]:
+                try:
+                    stack[-1]["profile"].enable()
+                except ValueError:  # another thread took the profiler meanwhile
+                    pass
+        else:
+            self._active.pop(threading.get_ident(), None)
+
+    def _sample(self):
+        """Record the call stack of every other thread, prefixed with its current stage."""
+        own = threading.get_ident()
+        while not self._stop.wait(self.sample_interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                names.append(f"stage:{self._active.get(thread_id, 'other')}")
+                key = ";".join(reversed(names))
+                self.samples[key] = self.samples.get(key, 0) + 1
+
+    def write(self):
+        """
+        Write <stage>.pstats for every profiled stage, summary.txt and stacks.folded
+        (collapsed stacks for flamegraph.pl, speedscope or inferno).
+
+        Returns:
+            list: paths of the files written.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        written = []
+        summary = io.StringIO()
+        summary.write(f"Peak traced memory: {self.peak_memory / 1024:.1f} KiB\n")
+
+        for stage, data in sorted(self.stages.items()):
+            summary.write(
+                f"\n=== {stage}: {data['count']} runs, {data['seconds']:.3f}s wall"
+                + (f", {data['unprofiled']} not profiled" if data["unprofiled"] else "") + " ===\n"
+            )
+            if data["profiles"]:
+                stats = pstats.Stats(data["profiles"][0], stream=summary)
+                for profile in data["profiles"][1:]:
+                    stats.add(profile)
+                path = os.path.join(self.directory, f"{stage}.pstats")
+                stats.dump_stats(path)
+                written.append(path)
+                stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+
+            summary.write("Top allocations (net size, count):\n")
+            top = sorted(data["allocations"].items(), key=lambda item: item[1][0], reverse=True)
+            for location, (size, count) in top[:TOP_ALLOCATIONS]:
+                summary.write(f"  {size / 1024:>10.1f} KiB {count:>8}  {location}\n")
+
+        path = os.path.join(self.directory, "summary.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(summary.getvalue())
+        written.append(path)
+
+        path = os.path.join(self.directory, "stacks.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(self.samples.items()):
+                f.write(f"{stack} {count}\n")
+        written.append(path)
+        return written
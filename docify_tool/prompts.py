@@ -1,3 +1,10 @@
+# Shared context prompts
+
+context_system_prompt = """You are Docify-AI, an assistant that writes documentation, tests and
+configuration files for software projects.
+The project context is provided first. The instructions for the specific task follow it."""
+
+
 # Readme prompts
 
 readme_system_prompt = """You are an expert technical writer and software engineer.
@@ -40,28 +47,40 @@ Then, generate a README optimized for that domain:
    - Testing instructions (if tests/ directory exists).
    - Deployment instructions (if Dockerfile, CI/CD, or cloud configs exist).
 
-Here is the project context: 
+Use the project context given above.
+"""
+
+readme_section_system_prompt = """You are an expert technical writer and software engineer.
+You are updating one section of an existing README.md after some project files changed.
+
+You must:
+- Rewrite the section so it is accurate for the project files given above.
+- Keep the same heading, tone and level of detail as the current section.
+- Always output ONLY the markdown for that one section, no explanations or extra text."""
+
+readme_section_user_prompt = """Here is the current section of the README. Please update it:
+
+{section}
 """
 
 
 # test prompts
 
-test_system_prompt = """You are an expert Python software assistant.  
-You are given the full content of a Python project directory.  
-Your role is to analyze the project and generate runnable pytest test files.  
-
-Rules:  
-1. Write complete and runnable pytest test files for all modules.  
-2. Cover normal cases, edge cases, and exception scenarios.  
-3. Organize tests inside a `tests/` folder, naming files `test_<module>.py`.  
-4. Use descriptive test function names.  
-5. Output must be a single JSON object where:
-   - Keys = file paths (e.g., "tests/test_module.py").  
-   - Values = full content of that file.  
-6. Do not include explanations, only valid JSON.    
+test_module_system_prompt = """You are an expert Python software assistant.
+You are given one module of a Python project, followed by skeletons (signatures only)
+of the project modules it depends on.
+Your role is to write one runnable pytest test file for that module.
+
+Rules:
+1. Test only the given module; use the dependency skeletons to know what it calls.
+2. Cover normal cases, edge cases, and exception scenarios.
+3. Mock network, filesystem and API access where needed.
+4. Use descriptive test function names.
+5. Output ONLY the Python source of the test file, no explanations or JSON.
 """
 
-test_user_prompt = """Here is my project context. Please generate pytest tests for it:"""
+test_module_user_prompt = """Please write pytest tests for the module `{path}` given above.
+Import it as `{module}`."""
 
 
 # DOCKERFILE PROMPTS
@@ -73,9 +92,21 @@ Only output the Dockerfile content without explanations."""
 docker_user_prompt = """Please generate a Dockerfile for the following project.
 Consider the project type (CLI, web service, or library), dependencies, and entry points.
 If it's a web service, expose the correct port and run the server.
-Here is the complete project context:
+Use the project files given above.
 """
 
+# Only the `pinned` files found near the project root and then the top-ranked project
+# files for `query` (BM25 over paths, symbols and contents) are sent, up to `budget` characters.
+docker_retrieval = {
+    "query": "requirements pyproject setup dependencies install package main app server entrypoint "
+             "cli port listen host run uvicorn gunicorn flask fastapi django manage wsgi asgi "
+             "dockerfile docker compose environ env config",
+    "pinned": ["Dockerfile", "docker-compose.yml", "requirements.txt", "pyproject.toml", "setup.py",
+               "setup.cfg", "Pipfile", "package.json", "main.py", "app.py", "__main__.py", "manage.py",
+               "wsgi.py", "asgi.py", "cli.py"],
+    "budget": 24000,
+}
+
 # GITHUB ACTIONS PROMPTS
 
 gha_system_prompt = """You are an expert in CI/CD automation using GitHub Actions.
@@ -89,9 +120,18 @@ It should:
 3. Run pytest for testing.
 4. If a Dockerfile exists, also add steps to build the Docker image.
 
-Here is the complete project context:
+Use the project files given above.
 """
 
+gha_retrieval = {
+    "query": "pytest test tests conftest tox nox ci workflow lint flake8 ruff mypy black build backend "
+             "pyproject setup setuptools poetry hatch requirements dev python version dockerfile makefile",
+    "pinned": ["pyproject.toml", "setup.py", "setup.cfg", "requirements.txt", "requirements-dev.txt",
+               "tox.ini", "noxfile.py", "pytest.ini", "conftest.py", "Makefile", "Dockerfile",
+               ".pre-commit-config.yaml"],
+    "budget": 24000,
+}
+
 # PROJECT INIT PROMPTS
 
 init_system_prompt = """You are an expert Python project bootstrap assistant.
@@ -102,7 +142,7 @@ Return them as a JSON object where:
 - Values = file content
 Do not include explanations, only JSON."""
 
-init_user_prompt = """Please generate a new Python project scaffold based on the following requirements:
+init_user_prompt = """Please generate a new Python project scaffold based on the requirements given above.
 """
 
 # DOCSTRING PROMPTS
@@ -123,7 +163,20 @@ Rules:
 6. Return the full updated code with docstrings inserted, nothing else.
 """
 
-docstring_user_prompt = """Please add docstrings to the following Python code:
+docstring_user_prompt = """Please add docstrings to the Python code given above.
+"""
+
+symbol_docstring_system_prompt = """You are an expert Python software documentation assistant.
+You are given the source of a single Python module, class, or function (possibly abbreviated).
+Your job is to write the docstring for it.
+
+Rules:
+1. Use Google-style docstrings (with Args, Returns, Raises where they apply).
+2. Keep descriptions concise and accurate.
+3. Output ONLY the docstring text: no quotes, no code, no markdown fences, no indentation.
+"""
+
+symbol_docstring_user_prompt = """Please write the docstring for the {kind} {name} given above.
 """
 
 # NOTEBOOK PROMPTS
@@ -146,8 +199,7 @@ Rules:
 """
 
 notebook_user_prompt = """Please generate a starter Jupyter Notebook (.ipynb format) for this project.  
-Project context:
-{project_context}
+Use the project context given above.
 
 Dataset info (schema + sample rows if available):
 {dataset_context}
@@ -176,13 +228,21 @@ Rules:
 """
 
 model_card_user_prompt = """Please generate a MODEL_CARD.md for this project.  
-Project context:
-{project_context}
+Use the project context given above.
 
 Dataset info (schema + sample rows if available):
 {dataset_context}
 """
 
+model_card_retrieval = {
+    "query": "model train training fit epoch loss optimizer evaluate evaluation metrics accuracy f1 "
+             "predict inference dataset data preprocess features torch tensorflow keras sklearn "
+             "transformers huggingface checkpoint weights license citation readme",
+    "pinned": ["README.md", "requirements.txt", "pyproject.toml", "train.py", "evaluate.py", "model.py",
+               "config.yaml", "params.yaml", "LICENSE"],
+    "budget": 40000,
+}
+
 # json_fix_system_prompt
 
 json_fix_system_prompt = """
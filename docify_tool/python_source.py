@@ -0,0 +1,172 @@
+import re
+import ast
+import textwrap
+
+MAX_SNIPPET_LINES = 80  # longest function body sent for a single docstring
+
+
+def source_lines(source, keepends=False):
+    """
+    Split source into lines the way the tokenizer does (only \\n, \\r\\n and \\r end a line),
+    so indexes line up with ast line numbers.
+    """
+    lines = re.findall(r"[^\r\n]*(?:\r\n|\r|\n)|[^\r\n]+$", source)
+    if keepends:
+        return lines
+    return [line.rstrip("\r\n") for line in lines]
+
+
+def _header_start(node):
+    """First line of a definition, including its decorators."""
+    return min([node.lineno] + [d.lineno for d in node.decorator_list])
+
+
+def _statement_start(node):
+    """First line of a statement, including its decorators if it has any."""
+    return _header_start(node) if getattr(node, "decorator_list", None) else node.lineno
+
+
+def _has_docstring(node):
+    body = getattr(node, "body", None)
+    return bool(body) and isinstance(body[0], ast.Expr) and isinstance(
+        getattr(body[0], "value", None), ast.Constant
+    ) and isinstance(body[0].value.value, str)
+
+
+def skeleton(source, include_docstrings=True):
+    """
+    Reduce Python source to imports, module-level assignments and class/function
+    signatures, with every function body replaced by `...`.
+
+    Returns the source unchanged if it cannot be parsed.
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return source
+    lines = source_lines(source)
+    out = []
+
+    def emit(node, depth):
+        if isinstance(node, (ast.Import, ast.ImportFrom, ast.Assign, ast.AnnAssign)) and depth == 0:
+            out.extend(lines[node.lineno - 1:node.end_lineno])
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            body_start = node.body[0].lineno
+            if body_start == node.lineno:  # one-line definition
+                out.append(lines[node.lineno - 1])
+                return
+            out.extend(lines[_header_start(node) - 1:body_start - 1])
+            indent = lines[body_start - 1][:node.body[0].col_offset]
+            if include_docstrings and _has_docstring(node):
+                out.extend(lines[node.body[0].lineno - 1:node.body[0].end_lineno])
+            if isinstance(node, ast.ClassDef):
+                children = [n for n in node.body if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))]
+                for child in children:
+                    emit(child, depth + 1)
+                if not children:
+                    out.append(f"{indent}...")
+            else:
+                out.append(f"{indent}...")
+
+    if include_docstrings and _has_docstring(tree):
+        out.extend(lines[tree.body[0].lineno - 1:tree.body[0].end_lineno])
+    for node in tree.body:
+        emit(node, 0)
+    return "\n".join(out)
+
+
+def find_missing_docstrings(source):
+    """
+    Locate the module, classes, functions and methods that have no docstring.
+
+    Functions nested inside other functions, one-line definitions and definitions
+    whose body starts on the last line of a multi-line signature are skipped.
+
+    Returns:
+        list: dicts with kind, name, insert_line (0-based line index to insert
+        before), indent and a compact source snippet for the prompt.
+    """
+    tree = ast.parse(source)
+    lines = source_lines(source)
+    symbols = []
+
+    if tree.body and not _has_docstring(tree):
+        symbols.append({
+            "kind": "module",
+            "name": "",
+            "insert_line": _statement_start(tree.body[0]) - 1,
+            "indent": "",
+            "snippet": skeleton(source),
+        })
+
+    def visit(node, qualname):
+        for child in node.body:
+            if not isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                continue
+            name = f"{qualname}.{child.name}" if qualname else child.name
+            first = child.body[0]
+            insert_line = _statement_start(first) - 1
+            indent = lines[insert_line][:first.col_offset]
+            if not _has_docstring(child) and not indent.strip():
+                if isinstance(child, ast.ClassDef):
+                    kind = "class"
+                    snippet = skeleton(textwrap.dedent("\n".join(lines[_header_start(child) - 1:child.end_lineno])))
+                else:
+                    kind = "method" if qualname and isinstance(node, ast.ClassDef) else "function"
+                    snippet_lines = lines[_header_start(child) - 1:child.end_lineno]
+                    if len(snippet_lines) > MAX_SNIPPET_LINES:
+                        snippet_lines = snippet_lines[:MAX_SNIPPET_LINES] + ["    # ... (truncated)"]
+                    snippet = "\n".join(snippet_lines)
+                symbols.append({
+                    "kind": kind,
+                    "name": name,
+                    "insert_line": insert_line,
+                    "indent": indent,
+                    "snippet": snippet,
+                })
+            if isinstance(child, ast.ClassDef):
+                visit(child, name)
+
+    visit(tree, "")
+    return symbols
+
+
+def format_docstring(text, indent):
+    """
+    Turn docstring text returned by the model into an indented triple-quoted literal.
+    """
+    text = text.strip()
+    for quote in ('"""', "'''"):
+        if text.startswith(quote) and text.endswith(quote) and len(text) >= 6:
+            text = text[3:-3].strip()
+    text = text.replace("\\", "\\\\").replace('"""', '\\"\\"\\"')
+
+    body = text.splitlines()
+    if len(body) == 1:
+        line = body[0][:-1] + '\\"' if body[0].endswith('"') else body[0]  # keep the closing quotes apart
+        return f'{indent}"""{line}"""'
+    formatted = [f'{indent}"""{body[0].strip()}']
+    rest = textwrap.dedent("\n".join(body[1:])).splitlines()
+    formatted.extend(f"{indent}{line.rstrip()}" if line.strip() else "" for line in rest)
+    formatted.append(f'{indent}"""')
+    return "\n".join(formatted)
+
+
+def insert_docstrings(source, insertions):
+    """
+    Splice docstrings into `source` at exact line positions, leaving every other line untouched.
+
+    Args:
+        source (str): Original file content.
+        insertions (list): (insert_line, docstring literal) pairs.
+
+    Returns:
+        str: The updated source.
+    """
+    newline = "\r\n" if "\r\n" in source else "\n"
+    lines = source_lines(source, keepends=True)
+
+    for insert_line, literal in sorted(insertions, key=lambda item: item[0], reverse=True):
+        block = [line + newline for line in literal.split("\n")]
+        lines[insert_line:insert_line] = block
+    return "".join(lines)
@@ -0,0 +1,204 @@
+import os
+import re
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from .helper import clean_fenced_content
+from .scanner import (
+    ENTRY_POINT_FILES, MANIFEST_FILES, SIDECAR_DIR, TEST_CONFIG_FILES,
+    ScanCache, build_manifest, format_file_context,
+)
+from .metrics import metrics
+
+README_MAP_FILE = "readme_map.json"
+
+SOURCE_EXTS = (
+    ".py", ".ipynb", ".js", ".jsx", ".ts", ".tsx", ".go", ".rs", ".java", ".kt",
+    ".rb", ".php", ".c", ".cc", ".cpp", ".h", ".hpp", ".cs", ".swift",
+)
+
+# Section kind by heading keyword; the first match wins.
+SECTION_KINDS = [
+    ("installation", ("install", "setup", "getting started", "requirement", "prerequisite")),
+    ("usage", ("usage", "example", "quick start", "quickstart", "command", "cli", "running")),
+    ("api", ("api", "reference", "endpoint", "module", "function")),
+    ("structure", ("structure", "layout", "tree", "director", "organization")),
+    ("testing", ("test",)),
+    ("deployment", ("deploy", "docker", "ci/cd", "continuous", "workflow")),
+    ("license", ("licen",)),
+    ("contributing", ("contribut",)),
+    ("technologies", ("technolog", "built with", "stack", "dependenc")),
+    ("features", ("feature",)),
+]
+
+# Sections that describe the project as a whole are refreshed when files are added or removed.
+STRUCTURAL_KINDS = {"structure", "overview", "features"}
+
+
+def split_sections(markdown):
+    """
+    Split a README into (heading, text) pairs at level-2 headings outside code fences.
+
+    The text before the first `##` heading is returned with an empty heading.
+    """
+    sections = [["", []]]
+    in_fence = False
+    for line in markdown.splitlines(keepends=True):
+        if line.lstrip().startswith(("```", "~~~")):
+            in_fence = not in_fence
+        if not in_fence and re.match(r"^##\s+\S", line):
+            sections.append([line.strip(), []])
+        sections[-1][1].append(line)
+    return [(heading, "".join(lines)) for heading, lines in sections if heading or "".join(lines).strip()]
+
+
+def classify_section(heading):
+    """Map a README heading to a section kind (installation, usage, api, ...)."""
+    lowered = heading.lower()
+    for kind, keywords in SECTION_KINDS:
+        if any(keyword in lowered for keyword in keywords):
+            return kind
+    return "overview"
+
+
+def section_inputs(kind, paths):
+    """
+    Return the project files (relative, '/'-separated) that inform a section of this kind.
+    """
+    def name(path):
+        return path.rsplit("/", 1)[-1]
+
+    def is_test(path):
+        return path.startswith("tests/") or "/tests/" in path or name(path).startswith("test_")
+
+    manifests = {p for p in paths if name(p) in MANIFEST_FILES}
+    entry_points = {p for p in paths if name(p) in ENTRY_POINT_FILES}
+
+    if kind in ("installation", "technologies"):
+        inputs = manifests
+    elif kind in ("usage", "overview", "features"):
+        inputs = manifests | entry_points
+    elif kind == "api":
+        inputs = {p for p in paths if p.endswith(SOURCE_EXTS) and not is_test(p)}
+    elif kind == "testing":
+        inputs = {p for p in paths if is_test(p) or name(p) in TEST_CONFIG_FILES}
+    elif kind == "deployment":
+        inputs = manifests | {
+            p for p in paths
+            if name(p).startswith(("Dockerfile", "docker-compose", "Procfile")) or p.startswith(".github/workflows/")
+        }
+    elif kind == "license":
+        inputs = {p for p in paths if name(p).upper().startswith(("LICENSE", "LICENCE", "COPYING"))}
+    elif kind == "contributing":
+        inputs = {p for p in paths if name(p).upper().startswith(("CONTRIBUTING", "CODE_OF_CONDUCT"))}
+    else:  # structure: driven by files being added or removed
+        inputs = set()
+    return sorted(inputs)
+
+
+def build_section_map(readme, manifest):
+    """Record the kind and input files of every section of `readme`."""
+    return [
+        {"heading": heading, "kind": kind, "inputs": section_inputs(kind, manifest)}
+        for heading, kind in ((h, classify_section(h)) for h, _ in split_sections(readme))
+    ]
+
+
+def load_readme_map(root):
+    """Return the sidecar map for `root`, or None if there is none (or it is unreadable)."""
+    try:
+        with open(os.path.join(root, SIDECAR_DIR, README_MAP_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_readme_map(root, readme, manifest):
+    """Write the sidecar map describing `readme` and the manifest it was generated from."""
+    os.makedirs(os.path.join(root, SIDECAR_DIR), exist_ok=True)
+    with open(os.path.join(root, SIDECAR_DIR, README_MAP_FILE), "w", encoding="utf-8") as f:
+        json.dump({"manifest": manifest, "sections": build_section_map(readme, manifest)}, f, indent=2)
+
+
+def write_readme_incremental(generator, client, root, project_context, output_file,
+                             ignore_dirs=None, ignore_exts=None, cache=None, workers=4):
+    """
+    Regenerate only the README sections whose input files changed since the last run.
+
+    Falls back to a full README when there is no previous README or sidecar map.
+
+    Returns:
+        str: `output_file` if the README was written, None if it was up to date.
+    """
+    cache = cache or ScanCache()
+    readme_path = os.path.relpath(os.path.abspath(output_file), os.path.abspath(root)).replace(os.sep, "/")
+    manifest = build_manifest(root, ignore_dirs, ignore_exts, cache)
+    manifest.pop(readme_path, None)
+
+    sidecar = load_readme_map(root)
+    if sidecar is None or not os.path.exists(output_file):
+        print("No previous README map found, generating the full README...")
+        with metrics.span("generate", action="readme"):
+            content = clean_fenced_content(getattr(generator, f"generate_readme_{client}")(project_context))
+        with metrics.span("write", action="readme", path=output_file):
+            if os.path.dirname(output_file):
+                os.makedirs(os.path.dirname(output_file), exist_ok=True)
+            with open(output_file, "w", encoding="utf-8") as f:
+                f.write(content)
+            save_readme_map(root, content, manifest)
+        print(f"Successfully generated README/docs at {output_file}")
+        return output_file
+
+    previous = sidecar.get("manifest", {})
+    changed = {p for p in manifest if previous.get(p) != manifest[p]} | (set(previous) - set(manifest))
+    structural = set(manifest) != set(previous)
+
+    with open(output_file, "r", encoding="utf-8") as f:
+        sections = split_sections(f.read())
+    recorded = {entry["heading"]: entry for entry in sidecar.get("sections", [])}
+
+    stale = []
+    for index, (heading, _) in enumerate(sections):
+        entry = recorded.get(heading)
+        if entry is None:  # added by hand after the last run; leave it alone
+            continue
+        # Current inputs too, so files added since the last run (e.g. a new module for
+        # the API reference) make their section stale.
+        inputs = set(entry["inputs"]) | set(section_inputs(entry["kind"], manifest))
+        if changed & inputs or (structural and entry["kind"] in STRUCTURAL_KINDS):
+            stale.append(index)
+
+    if not stale:
+        print(f"README is up to date ({len(changed)} changed files affect no section).")
+        save_readme_map(root, "".join(text for _, text in sections), manifest)
+        return None
+
+    print(f"Updating {len(stale)} of {len(sections)} README sections ({len(changed)} changed files)...")
+    generate = getattr(generator, f"generate_readme_section_{client}")
+    file_list = "--- Project files ---\n" + "\n".join(sorted(manifest)) + "\n"
+
+    def regenerate(index):
+        heading, text = sections[index]
+        kind = recorded[heading]["kind"]
+        inputs = section_inputs(kind, manifest)
+        context = format_file_context(
+            (path, cache.read(os.path.join(root, path))) for path in inputs
+        ) + file_list
+        new_text = clean_fenced_content(generate(context, text.strip()))
+        if heading and not new_text.lstrip().startswith("#"):
+            new_text = f"{heading}\n\n{new_text}"
+        trailing = text[len(text.rstrip()):] or "\n"
+        return index, new_text.rstrip() + trailing
+
+    with metrics.span("generate", action="readme", sections=len(stale)):
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(stale)))) as pool:
+            for index, new_text in pool.map(regenerate, stale):
+                sections[index] = (sections[index][0], new_text)
+
+    readme = "".join(text for _, text in sections)
+    with metrics.span("write", action="readme", path=output_file):
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write(readme)
+        save_readme_map(root, readme, manifest)
+    print(f"Successfully updated README/docs at {output_file}")
+    return output_file
@@ -0,0 +1,208 @@
+import os
+import re
+import json
+import math
+import hashlib
+import itertools
+from collections import Counter
+
+from .scanner import SIDECAR_DIR, ScanCache, format_file_context, iter_project_files
+from .metrics import metrics
+
+INDEX_FILE = "index.json"
+INDEX_VERSION = 1
+
+# BM25F-style field boosts: a query term in the file path counts most, then symbol names.
+FIELD_BOOSTS = {"path": 5.0, "symbols": 2.0, "content": 1.0}
+BM25_K1 = 1.5
+BM25_B = 0.75
+MAX_FILE_SHARE = 4  # a single file takes at most 1/4 of an action's budget
+MAX_LISTED_FILES = 300  # paths listed after the retrieved files
+MAX_PINNED_DEPTH = 1  # pinned files are looked for in the root and its direct subdirectories
+
+_WORD = re.compile(r"[A-Za-z0-9]+")
+_PART = re.compile(r"[A-Z]?[a-z0-9]+|[A-Z]+(?![a-z])")
+_SYMBOL = re.compile(r"^\s*(?:async\s+)?(?:def|class|function)\s+([A-Za-z_]\w*)", re.MULTILINE)
+
+
+def tokenize(text):
+    """Lower-cased words of `text`; camelCase and snake_case names also yield their parts."""
+    tokens = []
+    for word in _WORD.findall(text):
+        lowered = word.lower()
+        if len(lowered) > 1:
+            tokens.append(lowered)
+        parts = _PART.findall(word)
+        if len(parts) > 1:
+            tokens.extend(part.lower() for part in parts if len(part) > 1)
+    return tokens
+
+
+def field_terms(relative_path, content):
+    """Term counts of one file per field: its path, its symbol names and its contents."""
+    return {
+        "path": dict(Counter(tokenize(relative_path))),
+        "symbols": dict(Counter(token for symbol in _SYMBOL.findall(content) for token in tokenize(symbol))),
+        "content": dict(Counter(tokenize(content))),
+    }
+
+
+class RetrievalIndex:
+    """
+    BM25 index over a project's files (paths, symbol names and contents).
+
+    Built once per scan; files whose content hash did not change since the
+    persisted index keep their term counts.
+    """
+
+    def __init__(self, files=None):
+        self.files = files or {}  # relative path -> {"sha1", "fields": {field: {term: count}}}
+        self._df = None  # field -> document frequency of each term
+
+    @classmethod
+    def build(cls, root, ignore_dirs=None, ignore_exts=None, cache=None, previous=None):
+        """Index every non-ignored file under `root`, reusing unchanged entries of `previous`."""
+        cache = cache or ScanCache()
+        previous = previous.files if previous else {}
+        files = {}
+        reused = 0
+        with metrics.span("index", root=root) as span:
+            for relative_path, file_path in iter_project_files(root, ignore_dirs, ignore_exts):
+                relative_path = relative_path.replace(os.sep, "/")
+                try:
+                    content = cache.read(file_path)
+                except Exception:
+                    continue
+                sha1 = hashlib.sha1(content.encode("utf-8", "ignore")).hexdigest()
+                entry = previous.get(relative_path)
+                if entry and entry["sha1"] == sha1:
+                    files[relative_path] = entry
+                    reused += 1
+                    continue
+                files[relative_path] = {"sha1": sha1, "fields": field_terms(relative_path, content)}
+            span.set(files=len(files), reused=reused)
+        return cls(files)
+
+    @classmethod
+    def load(cls, root):
+        """Return the index persisted under `root`, or None if there is none (or it is unusable)."""
+        try:
+            with open(os.path.join(root, SIDECAR_DIR, INDEX_FILE), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != INDEX_VERSION:
+            return None
+        return cls(data.get("files", {}))
+
+    def save(self, root):
+        """Persist the index to .docify/index.json under `root`."""
+        os.makedirs(os.path.join(root, SIDECAR_DIR), exist_ok=True)
+        with open(os.path.join(root, SIDECAR_DIR, INDEX_FILE), "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "files": self.files}, f, separators=(",", ":"))
+
+    def search(self, query):
+        """Return (relative_path, score) pairs matching `query`, best first."""
+        total = len(self.files)
+        if not total:
+            return []
+        if self._df is None:
+            self._df = {
+                field: Counter(term for entry in self.files.values() for term in entry["fields"][field])
+                for field in FIELD_BOOSTS
+            }
+        terms = set(tokenize(query))
+        idf = {
+            field: {
+                term: math.log(1 + (total - df[term] + 0.5) / (df[term] + 0.5))
+                for term in terms if df[term]
+            }
+            for field, df in self._df.items()
+        }
+        averages = {
+            field: sum(sum(entry["fields"][field].values()) for entry in self.files.values()) / total or 1.0
+            for field in FIELD_BOOSTS
+        }
+
+        scores = []
+        for relative_path, entry in self.files.items():
+            score = 0.0
+            for field, boost in FIELD_BOOSTS.items():
+                counts = entry["fields"][field]
+                matched = [term for term in idf[field] if term in counts]
+                if not matched:
+                    continue
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * sum(counts.values()) / averages[field])
+                for term in matched:
+                    tf = counts[term]
+                    score += boost * idf[field][term] * tf * (BM25_K1 + 1) / (tf + norm)
+            if score > 0:
+                scores.append((relative_path, score))
+        scores.sort(key=lambda item: (-item[1], item[0]))
+        return scores
+
+    def pinned(self, names):
+        """Project files named in `names` near the root, shallowest first."""
+        names = set(names)
+        return sorted(
+            (path for path in self.files
+             if path.rsplit("/", 1)[-1] in names and path.count("/") <= MAX_PINNED_DEPTH),
+            key=lambda path: (path.count("/"), path),
+        )
+
+    def context(self, root, query, budget, cache=None, pinned=()):
+        """
+        Build a project context from the `pinned` files and then the top-ranked
+        files for `query`, at most `budget` characters of file content, followed
+        by the list of project files. Empty if no file was selected.
+        """
+        cache = cache or ScanCache()
+        selected = []
+        seen = set()
+        remaining = budget
+        ranked = (path for path, _ in self.search(query))
+        for relative_path in itertools.chain(self.pinned(pinned), ranked):
+            if remaining <= 0:
+                break
+            if relative_path in seen:
+                continue
+            seen.add(relative_path)
+            try:
+                content = cache.read(os.path.join(root, relative_path))
+            except Exception:
+                continue
+            limit = min(remaining, budget // MAX_FILE_SHARE)
+            if len(content) > limit:
+                if limit < budget // 10:
+                    continue  # too little room left for a useful excerpt
+                content = content[:limit] + "\n[... truncated]"
+            selected.append((relative_path, content))
+            remaining -= len(content)
+        if not selected:
+            return ""
+
+        paths = sorted(self.files)
+        listing = "\n".join(paths[:MAX_LISTED_FILES])
+        if len(paths) > MAX_LISTED_FILES:
+            listing += f"\n[... {len(paths) - MAX_LISTED_FILES} more files]"
+        metrics.incr("retrieved_files", len(selected))
+        return format_file_context(selected) + f"--- Project files ---\n{listing}\n"
+
+
+def retrieve_contexts(root, specs, ignore_dirs=None, ignore_exts=None, cache=None):
+    """
+    Build (or refresh) the persisted retrieval index of `root` once and return the
+    context of every action in `specs` (action -> {"query", "budget", "pinned"}).
+    """
+    cache = cache or ScanCache()
+    index = RetrievalIndex.build(root, ignore_dirs, ignore_exts, cache, previous=RetrievalIndex.load(root))
+    if index.files:
+        try:
+            index.save(root)
+        except OSError as e:
+            print(f"Could not save the retrieval index: {e}")
+    with metrics.span("retrieve", actions=",".join(specs)):
+        return {
+            action: index.context(root, spec["query"], spec["budget"], cache, spec.get("pinned", ()))
+            for action, spec in specs.items()
+        }
@@ -1,5 +1,28 @@
 import os
+import io
 import json
+import hashlib
+import tempfile
+import threading
+
+from .metrics import metrics
+
+# Well-known files by the role they play in a project.
+MANIFEST_FILES = {
+    "requirements.txt", "requirements-dev.txt", "pyproject.toml", "setup.py", "setup.cfg",
+    "Pipfile", "package.json", "environment.yml", "Dockerfile", ".dockerignore",
+}
+ENTRY_POINT_FILES = {"main.py", "app.py", "__main__.py", "manage.py", "wsgi.py", "asgi.py", "cli.py"}
+TEST_CONFIG_FILES = {"pytest.ini", "tox.ini", "noxfile.py", "conftest.py", "setup.cfg", "pyproject.toml"}
+
+# Per-project state kept between runs (README section map, retrieval index).
+SIDECAR_DIR = ".docify"
+
+# Contexts larger than this (in characters) are assembled in a temporary file instead of memory.
+SPOOL_THRESHOLD = 64 * 1024 * 1024
+SPOOL_CHUNK_CHARS = 1024 * 1024
+# File contents kept by a ScanCache; later reads beyond it are not cached.
+SCAN_CACHE_MAX_CHARS = 256 * 1024 * 1024
 
 def read_notebook_source(file_path):
     """Read Jupyter notebook and return concatenated code + markdown cells."""
@@ -16,45 +39,196 @@ def read_notebook_source(file_path):
     except Exception as e:
         return f"[Error reading notebook: {e}]"
 
-def get_project_context(root_dir, ignore_dirs=None, ignore_exts=None):
+def read_file(file_path):
+    """Read a project file as text, using the notebook reader for .ipynb files."""
+    if file_path.endswith(".ipynb"):
+        return read_notebook_source(file_path)
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
+        return file.read()
+
+
+class ScanCache:
     """
-    Walks through a directory, gets file structure and content,
-    returns a formatted string including notes about ignored files/directories.
+    Thread-safe cache of file contents keyed by absolute path.
+
+    Entries are validated against the file's mtime and size, so one cache can be
+    shared by every root scanned in a run (nested roots read each file once).
+    """
+
+    def __init__(self, max_chars=SCAN_CACHE_MAX_CHARS):
+        self.max_chars = max_chars
+        self._entries = {}
+        self._chars = 0
+        self._lock = threading.Lock()
+
+    def read(self, file_path):
+        """Return the text of `file_path`, reading it only if it changed since the last call."""
+        key = os.path.abspath(file_path)
+        stat = os.stat(key)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            metrics.incr("scan_cache_hits")
+            return entry[2]
+
+        content = read_file(file_path)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous:
+                self._chars -= len(previous[2])
+            if self.max_chars is None or self._chars + len(content) <= self.max_chars:
+                self._entries[key] = (stat.st_mtime_ns, stat.st_size, content)
+                self._chars += len(content)
+        return content
+
+
+class ContextBuilder:
+    """
+    Assembles a prompt context by writing each segment once, in memory up to
+    `spool_threshold` characters and in a temporary file beyond it, so a large
+    context exists as a single string only when getvalue() hands it over.
+    """
+
+    def __init__(self, spool_threshold=SPOOL_THRESHOLD):
+        self.spool_threshold = spool_threshold
+        self.size = 0
+        self._buffer = io.StringIO()
+        self._spooled = False
+
+    def write(self, text):
+        """Append `text` to the context."""
+        if not self._spooled and self.size + len(text) > self.spool_threshold:
+            spool = tempfile.TemporaryFile(mode="w+", encoding="utf-8", newline="")
+            spool.write(self._buffer.getvalue())
+            self._buffer.close()
+            self._buffer = spool
+            self._spooled = True
+        self._buffer.write(text)
+        self.size += len(text)
+
+    def write_file(self, relative_path, content):
+        """Append one file in the get_project_context layout."""
+        self.write(f"--- File: {relative_path} ---\n")
+        self.write(content)
+        self.write("\n\n")
+
+    def getvalue(self):
+        """Return the assembled context and release the buffer."""
+        if not self._spooled:
+            value = self._buffer.getvalue()
+            self._buffer.close()
+            return value
+
+        # Read the spool back in chunks. CPython grows a string that has no other
+        # reference in place, so the context is never held twice (unlike join or
+        # StringIO.getvalue, which copy every piece into a new string).
+        self._buffer.seek(0)
+        value = ""
+        for chunk in iter(lambda: self._buffer.read(SPOOL_CHUNK_CHARS), ""):
+            value += chunk
+        self._buffer.close()
+        return value
+
+
+def is_ignored(relative_path, ignore_dirs=None, ignore_exts=None):
+    """Return True if a path relative to the project root falls under the ignore rules."""
+    parts = relative_path.replace(os.sep, "/").split("/")
+    if any(part in (ignore_dirs or ()) for part in parts[:-1]):
+        return True
+    return any(parts[-1].endswith(ext) for ext in (ignore_exts or ()))
+
+
+def iter_project_files(root_dir, ignore_dirs=None, ignore_exts=None):
+    """
+    Yield (relative_path, file_path) for every file that is not ignored,
+    in the same order get_project_context visits them.
     """
     ignore_dirs = set(ignore_dirs or [])
     ignore_exts = set(ignore_exts or [])
-    full_context = []
 
     for dirpath, dirnames, filenames in os.walk(root_dir):
-        # Track ignored dirs
-        ignored_dirs_in_path = [d for d in dirnames if d in ignore_dirs]
-        for d in ignored_dirs_in_path:
-            full_context.append(f"--- Ignored directory: {os.path.join(dirpath, d)} ---\n")
-        
         dirnames[:] = [d for d in dirnames if d not in ignore_dirs]
-
         for filename in filenames:
-            file_path = os.path.join(dirpath, filename)
-            relative_path = os.path.relpath(file_path, root_dir)
-
-            # Track ignored files
             if any(filename.endswith(ext) for ext in ignore_exts):
-                full_context.append(f"--- Ignored file: {relative_path} ---\n")
                 continue
+            file_path = os.path.join(dirpath, filename)
+            yield os.path.relpath(file_path, root_dir), file_path
+
+
+def format_file_context(files):
+    """Render (relative_path, content) pairs in the get_project_context layout."""
+    builder = ContextBuilder()
+    for relative_path, content in files:
+        builder.write_file(relative_path, content)
+    return builder.getvalue()
+
 
-            full_context.append(f"--- File: {relative_path} ---\n")
-            try:
-                if filename.endswith(".ipynb"):
-                    content = read_notebook_source(file_path)
-                else:
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-                        content = file.read()
-                full_context.append(content)
-            except Exception as e:
-                full_context.append(f"[Error reading file: {e}]")
-            full_context.append("\n\n")
+def build_manifest(root_dir, ignore_dirs=None, ignore_exts=None, cache=None):
+    """
+    Return {relative_path: sha1 of content} for every file that is not ignored.
+    """
+    manifest = {}
+    for relative_path, file_path in iter_project_files(root_dir, ignore_dirs, ignore_exts):
+        try:
+            content = cache.read(file_path) if cache else read_file(file_path)
+        except Exception:
+            continue
+        manifest[relative_path.replace(os.sep, "/")] = hashlib.sha1(content.encode("utf-8", "ignore")).hexdigest()
+    return manifest
 
-    return "".join(full_context)
+
+def get_project_context(root_dir, ignore_dirs=None, ignore_exts=None, cache=None):
+    """
+    Walks through a directory, gets file structure and content,
+    returns a formatted string including notes about ignored files/directories.
+
+    When a ScanCache is given, unchanged files are served from it.
+    """
+    ignore_dirs = set(ignore_dirs or [])
+    ignore_exts = set(ignore_exts or [])
+    full_context = ContextBuilder()
+    files_scanned = 0
+    files_ignored = 0
+    bytes_read = 0
+
+    with metrics.span("scan", root=root_dir) as span:
+        for dirpath, dirnames, filenames in os.walk(root_dir):
+            # Track ignored dirs
+            ignored_dirs_in_path = [d for d in dirnames if d in ignore_dirs]
+            for d in ignored_dirs_in_path:
+                full_context.write(f"--- Ignored directory: {os.path.join(dirpath, d)} ---\n")
+
+            dirnames[:] = [d for d in dirnames if d not in ignore_dirs]
+
+            for filename in filenames:
+                file_path = os.path.join(dirpath, filename)
+                relative_path = os.path.relpath(file_path, root_dir)
+
+                # Track ignored files
+                if any(filename.endswith(ext) for ext in ignore_exts):
+                    full_context.write(f"--- Ignored file: {relative_path} ---\n")
+                    files_ignored += 1
+                    continue
+
+                full_context.write(f"--- File: {relative_path} ---\n")
+                try:
+                    content = cache.read(file_path) if cache else read_file(file_path)
+                    full_context.write(content)
+                    files_scanned += 1
+                    if metrics.enabled:
+                        bytes_read += os.path.getsize(file_path)
+                except Exception as e:
+                    full_context.write(f"[Error reading file: {e}]")
+                full_context.write("\n\n")
+
+        context = full_context.getvalue()
+        span.set(files_scanned=files_scanned, files_ignored=files_ignored,
+                 bytes_read=bytes_read, context_chars=len(context))
+
+    metrics.incr("files_scanned", files_scanned)
+    metrics.incr("files_ignored", files_ignored)
+    metrics.incr("bytes_read", bytes_read)
+    return context
 
 def get_project_structure(path, ignore_dirs=None):
     """
@@ -64,21 +238,24 @@ def get_project_structure(path, ignore_dirs=None):
     ignore_dirs = set(ignore_dirs or [])
     tree = []
 
-    for root, dirs, files in os.walk(path):
-        rel = os.path.relpath(root, path)
-        if rel == ".":
-            tree.append(f"{os.path.basename(path)}/")
-        else:
-            tree.append(f"{rel}/")
-
-        # Show files in this directory
-        for f in files:
-            tree.append(f"  {f}")
-
-        # Handle ignored directories: show them but remove from traversal
-        for d in dirs[:]:
-            if d in ignore_dirs:
-                tree.append(f"  {d}/ (ignored)")
-                dirs.remove(d)  # Prevent os.walk from entering it
+    with metrics.span("scan_structure", root=path) as span:
+        for root, dirs, files in os.walk(path):
+            rel = os.path.relpath(root, path)
+            if rel == ".":
+                tree.append(f"{os.path.basename(path)}/")
+            else:
+                tree.append(f"{rel}/")
+
+            # Show files in this directory
+            for f in files:
+                tree.append(f"  {f}")
+
+            # Handle ignored directories: show them but remove from traversal
+            for d in dirs[:]:
+                if d in ignore_dirs:
+                    tree.append(f"  {d}/ (ignored)")
+                    dirs.remove(d)  # Prevent os.walk from entering it
+
+        span.set(entries=len(tree))
 
     return "\n".join(tree)
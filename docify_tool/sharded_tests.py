@@ -0,0 +1,186 @@
+import os
+import ast
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .helper import clean_fenced_content
+from .python_source import skeleton
+from .scanner import ScanCache, format_file_context, iter_project_files
+from .metrics import metrics
+
+SHARD_RETRIES = 2  # extra attempts per module before it is reported as failed
+
+
+class ShardsFailed(ValueError):
+    """Raised when some modules got no tests; `written` lists the test files that were written."""
+
+    def __init__(self, message, written):
+        super().__init__(message)
+        self.written = written
+
+
+def is_test_file(relative_path):
+    """Return True for test modules, conftest.py and files inside a tests/ directory."""
+    parts = relative_path.split("/")
+    name = parts[-1]
+    return (
+        any(part in ("test", "tests") for part in parts[:-1])
+        or name.startswith("test_") or name.endswith("_test.py")
+        or name in ("conftest.py", "setup.py", "noxfile.py")
+    )
+
+
+def module_name(relative_path):
+    """Dotted import name of a '/'-separated module path (a leading src/ is dropped)."""
+    parts = relative_path[:-len(".py")].split("/")
+    if parts[0] == "src" and len(parts) > 1:
+        parts = parts[1:]
+    if parts[-1] == "__init__" and len(parts) > 1:
+        parts = parts[:-1]
+    return ".".join(parts)
+
+
+def _imported_modules(tree, module, is_package):
+    """Yield the dotted names a module imports, with relative imports resolved."""
+    package = module if is_package else module.rpartition(".")[0]
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                yield alias.name
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level:
+                anchor = package.split(".") if package else []
+                anchor = anchor[:len(anchor) - (node.level - 1)] if node.level > 1 else anchor
+                base = ".".join(anchor + ([base] if base else []))
+            if base:
+                yield base
+            for alias in node.names:
+                yield f"{base}.{alias.name}" if base else alias.name
+
+
+def plan_test_shards(root, ignore_dirs=None, ignore_exts=None, cache=None):
+    """
+    Split a project into one test shard per Python module that defines functions or classes.
+
+    Returns:
+        list: dicts with the module's import name, path, source, the paths of the
+        project modules it imports and the test file to write.
+    """
+    cache = cache or ScanCache()
+    modules = {}
+    for relative_path, file_path in iter_project_files(root, ignore_dirs, ignore_exts):
+        relative_path = relative_path.replace(os.sep, "/")
+        if not relative_path.endswith(".py") or is_test_file(relative_path):
+            continue
+        try:
+            source = cache.read(file_path)
+            tree = ast.parse(source)
+        except (OSError, SyntaxError, ValueError) as e:
+            print(f"Skipping {relative_path}: {e}")
+            continue
+        modules[module_name(relative_path)] = (relative_path, source, tree)
+
+    names = {}
+    for module in modules:
+        short = module.rsplit(".", 1)[-1]
+        names[short] = names.get(short, 0) + 1
+
+    shards = []
+    for module, (relative_path, source, tree) in sorted(modules.items()):
+        if not any(isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)) for node in tree.body):
+            continue
+        is_package = relative_path.endswith("__init__.py")
+        deps = sorted({
+            modules[name][0] for name in _imported_modules(tree, module, is_package)
+            if name in modules and name != module
+        })
+        short = module.rsplit(".", 1)[-1]
+        test_name = short if names[short] == 1 else module.replace(".", "_")
+        shards.append({
+            "module": module,
+            "path": relative_path,
+            "source": source,
+            "deps": [(path, modules[module_name(path)][1]) for path in deps],
+            "output": f"tests/test_{test_name}.py",
+        })
+    return shards
+
+
+def shard_context(shard):
+    """The module in full, followed by skeletons of the project modules it imports."""
+    context = format_file_context([(shard["path"], shard["source"])])
+    skeletons = [(path, skeleton(source)) for path, source in shard["deps"]]
+    skeletons = [(path, text) for path, text in skeletons if text.strip()]
+    if skeletons:
+        context += "--- Dependency skeletons ---\n\n" + format_file_context(skeletons)
+    return context
+
+
+def write_tests_sharded(generator, client, root, output_dir, ignore_dirs=None, ignore_exts=None,
+                        cache=None, workers=4, retries=SHARD_RETRIES, changed=None):
+    """
+    Generate one pytest file per module, writing each as soon as its request finishes.
+
+    Shards run concurrently (bounded by `workers` and the generator's rate limiter);
+    a shard whose request fails or whose output does not parse is retried on its own.
+    Given `changed` relative paths, only the modules that are (or import) one of
+    them are regenerated.
+
+    Returns:
+        list: paths of the test files written. Raises ShardsFailed if any shard failed.
+    """
+    start = time.perf_counter()
+    with metrics.span("test_shards", root=root) as span:
+        shards = plan_test_shards(root, ignore_dirs, ignore_exts, cache)
+        span.set(shards=len(shards))
+    if not shards:
+        raise ValueError("No Python modules with functions or classes found to test.")
+    if changed is not None:
+        changed = {path.replace(os.sep, "/") for path in changed}
+        shards = [
+            shard for shard in shards
+            if shard["path"] in changed or any(path in changed for path, _ in shard["deps"])
+        ]
+        if not shards:
+            print("No module tests affected by the changes.")
+            return []
+    print(f"Mode: Generating pytest tests for {len(shards)} modules...")
+
+    generate = getattr(generator, f"generate_module_test_{client}")
+
+    def task(shard):
+        context = shard_context(shard)
+        error = None
+        for attempt in range(retries + 1):
+            if attempt:
+                metrics.incr("retries")
+            try:
+                with metrics.span("generate", action="test", module=shard["module"], attempt=attempt):
+                    content = clean_fenced_content(generate(context, shard["module"], shard["path"]))
+                ast.parse(content)
+                return shard, content, None
+            except Exception as e:
+                error = e
+        return shard, None, error
+
+    written, failed = [], []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for future in as_completed([pool.submit(task, shard) for shard in shards]):
+            shard, content, error = future.result()
+            if content is None:
+                print(f"Failed to generate tests for {shard['module']}: {error}")
+                failed.append(shard["module"])
+                continue
+            out_path = os.path.join(output_dir, shard["output"])
+            with metrics.span("write", action="test", path=out_path):
+                os.makedirs(os.path.dirname(out_path), exist_ok=True)
+                with open(out_path, "w", encoding="utf-8") as f:
+                    f.write(content + "\n")
+            written.append(out_path)
+            print(f"Wrote {out_path}")
+
+    print(f"Generated {len(written)} of {len(shards)} test modules in {time.perf_counter() - start:.2f}s.")
+    if failed:
+        raise ShardsFailed(f"Tests could not be generated for: {', '.join(sorted(failed))}", written)
+    return written
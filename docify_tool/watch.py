@@ -0,0 +1,334 @@
+import os
+import sys
+import time
+import select
+import struct
+import ctypes
+import ctypes.util
+
+from .artifacts import RETRIEVAL, generate_artifacts, print_summary
+from .dataset_extractor import DATA_EXTS, extract_and_summarize
+from .retrieval import retrieve_contexts
+from .scanner import (
+    ENTRY_POINT_FILES, MANIFEST_FILES, SIDECAR_DIR, TEST_CONFIG_FILES,
+    format_file_context, get_project_structure, is_ignored, iter_project_files, read_file,
+)
+from .metrics import metrics
+
+
+def affected_artifacts(changed, actions):
+    """
+    Return the selected artifacts whose inputs are touched by the changed relative paths.
+    """
+    names = {os.path.basename(path) for path in changed}
+    python_changed = any(path.endswith((".py", ".ipynb")) for path in changed)
+    tests_changed = any(path.replace(os.sep, "/").startswith("tests/") for path in changed)
+    data_changed = any(os.path.splitext(path)[1].lower() in DATA_EXTS for path in changed)
+
+    affected = []
+    for action in actions:
+        if action in ("readme", "model_card"):
+            hit = True
+        elif action == "docker":
+            hit = bool(names & (MANIFEST_FILES | ENTRY_POINT_FILES))
+        elif action == "gha":
+            hit = bool(names & (MANIFEST_FILES | TEST_CONFIG_FILES)) or tests_changed
+        elif action == "test":
+            hit = python_changed
+        else:  # notebook
+            hit = data_changed or bool(names & MANIFEST_FILES)
+        if hit:
+            affected.append(action)
+    return affected
+
+
+class ProjectIndex:
+    """
+    In-memory copy of the project's readable files, updated incrementally from change events.
+
+    Scans of the root can take it in place of a ScanCache, so the tree is held once.
+    """
+
+    def __init__(self, root, ignore_dirs=None, ignore_exts=None):
+        self.root = root
+        self.ignore_dirs = set(ignore_dirs or [])
+        self.ignore_exts = set(ignore_exts or [])
+        self.files = {}
+
+    def build(self):
+        """Read every non-ignored file under the root."""
+        self.files = {}
+        for relative_path, file_path in iter_project_files(self.root, self.ignore_dirs, self.ignore_exts):
+            self._read(relative_path, file_path)
+        return self
+
+    def update(self, changed):
+        """Re-read changed files and drop deleted ones; returns the paths that were applied."""
+        applied = set()
+        for relative_path in changed:
+            if is_ignored(relative_path, self.ignore_dirs, self.ignore_exts):
+                continue
+            file_path = os.path.join(self.root, relative_path)
+            if os.path.isfile(file_path):
+                self._read(relative_path, file_path)
+                applied.add(relative_path)
+                continue
+            # Deleted file, or a deleted/moved directory and everything below it.
+            prefix = relative_path + os.sep
+            for known in [p for p in self.files if p == relative_path or p.startswith(prefix)]:
+                del self.files[known]
+                applied.add(known)
+        return applied
+
+    def _read(self, relative_path, file_path):
+        try:
+            self.files[relative_path] = read_file(file_path)
+        except Exception as e:
+            print(f"Skipping {relative_path}: {e}")
+            self.files.pop(relative_path, None)
+
+    def read(self, file_path):
+        """
+        Return the indexed text of `file_path`. Files outside the index (ignored or
+        unreadable) are read from disk, raising like ScanCache.read if they cannot be.
+        """
+        content = self.files.get(os.path.relpath(file_path, self.root))
+        return read_file(file_path) if content is None else content
+
+    def context(self):
+        """Render the index in the same layout as scanner.get_project_context."""
+        return format_file_context(self.files.items())
+
+
+class PollingWatcher:
+    """Detects changes by comparing mtime/size snapshots of the project tree."""
+
+    def __init__(self, root, ignore_dirs=None, interval=0.5):
+        self.root = root
+        self.ignore_dirs = set(ignore_dirs or [])
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        for relative_path, file_path in iter_project_files(self.root, self.ignore_dirs):
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            snapshot[relative_path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self, timeout):
+        """Return the relative paths changed within `timeout` seconds (possibly empty)."""
+        deadline = time.monotonic() + timeout
+        while True:
+            snapshot = self._scan()
+            changed = {
+                path for path in set(snapshot) | set(self._snapshot)
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+            remaining = deadline - time.monotonic()
+            if changed or remaining <= 0:
+                return changed
+            time.sleep(min(self.interval, remaining))
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Linux inotify watcher over every non-ignored directory of the project tree."""
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_ISDIR = 0x40000000
+    MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT = struct.Struct("iIII")
+
+    def __init__(self, root, ignore_dirs=None):
+        self.root = root
+        self.ignore_dirs = set(ignore_dirs or [])
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs = {}
+        self._add_tree(root)
+
+    def _add_tree(self, directory):
+        for dirpath, dirnames, _ in os.walk(directory):
+            dirnames[:] = [d for d in dirnames if d not in self.ignore_dirs]
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dirpath), self.MASK)
+            if wd >= 0:
+                self._dirs[wd] = dirpath
+
+    def poll(self, timeout):
+        """Return the relative paths changed within `timeout` seconds (possibly empty)."""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        changed = set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self.EVENT.unpack_from(data, offset)
+            offset += self.EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+
+            directory = self._dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+            if mask & self.IN_ISDIR:
+                if name in self.ignore_dirs:
+                    continue
+                if mask & (self.IN_DELETE | self.IN_MOVED_FROM):
+                    changed.add(os.path.relpath(path, self.root))
+                elif mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    # Files may have landed before the watch was added.
+                    self._add_tree(path)
+                    for _, file_path in iter_project_files(path, self.ignore_dirs):
+                        changed.add(os.path.relpath(file_path, self.root))
+                continue
+            changed.add(os.path.relpath(path, self.root))
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+def create_watcher(root, ignore_dirs=None, force_polling=False):
+    """Return an inotify watcher on Linux, falling back to polling elsewhere or on failure."""
+    if not force_polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(root, ignore_dirs)
+        except (OSError, AttributeError) as e:
+            print(f"inotify unavailable ({e}), falling back to polling.")
+    return PollingWatcher(root, ignore_dirs)
+
+
+class WatchSession:
+    """
+    Keeps a project index and a warm generator, and regenerates the affected
+    artifacts after each debounced burst of file changes.
+    """
+
+    def __init__(self, generator, client, root, actions, ignore_dirs=None, ignore_exts=None,
+                 output=None, workers=4, debounce=1.0, force_polling=False):
+        self.generator = generator
+        self.client = client
+        self.root = root
+        self.actions = actions
+        self.ignore_dirs = ignore_dirs
+        self.ignore_exts = ignore_exts
+        self.output = output
+        self.workers = workers
+        self.debounce = debounce
+        self.index = ProjectIndex(root, ignore_dirs, ignore_exts).build()
+        self.watcher = create_watcher(root, ignore_dirs, force_polling)
+        self.latencies = []
+        # Files written by the previous cycle: their change events must not trigger another one.
+        self._written = set()
+
+    def _is_output(self, relative_path):
+        path = os.path.normpath(relative_path)
+        return path in self._written or path.split(os.sep)[0] == SIDECAR_DIR
+
+    def wait_for_changes(self, timeout=None):
+        """
+        Block until a burst of changes settles for `debounce` seconds.
+
+        Returns:
+            tuple: (changed relative paths, monotonic time of the first event), or (set(), None) on timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        changed = set()
+        while not changed:
+            remaining = 1.0 if deadline is None else deadline - time.monotonic()
+            if remaining <= 0:
+                return set(), None
+            changed = self.watcher.poll(min(remaining, 1.0))
+        first_event = time.monotonic()
+
+        while True:
+            more = self.watcher.poll(self.debounce)
+            if not more:
+                return changed, first_event
+            changed |= more
+
+    def step(self, timeout=None):
+        """
+        Run one watch cycle: wait for changes, update the index and regenerate what they affect.
+
+        Returns:
+            float: change-to-regeneration latency in seconds, or None if nothing was regenerated.
+        """
+        changed, first_event = self.wait_for_changes(timeout)
+        if not changed:
+            return None
+
+        applied = self.index.update(changed)
+        triggers = {path for path in applied if not self._is_output(path)}
+        self._written = set()
+        actions = affected_artifacts(triggers, self.actions) if triggers else []
+        if not actions:
+            return None
+
+        print(f"\n{len(triggers)} file(s) changed, regenerating: {', '.join(actions)}")
+        with metrics.span("watch_cycle", changed_files=len(triggers), actions=",".join(actions)) as span:
+            # Same contexts as build_contexts, with the full dump rendered from the in-memory index.
+            contexts = {"project": "", "structure": "", "dataset": "", "retrieved": {}}
+            if any(action not in ("notebook", "test") and action not in RETRIEVAL for action in actions):
+                contexts["project"] = self.index.context()
+            specs = {action: RETRIEVAL[action] for action in actions if action in RETRIEVAL}
+            if specs:
+                contexts["retrieved"] = retrieve_contexts(
+                    self.root, specs, self.ignore_dirs, self.ignore_exts, self.index
+                )
+            if "notebook" in actions:
+                contexts["structure"] = get_project_structure(self.root, ignore_dirs=self.ignore_dirs)
+            if "notebook" in actions or "model_card" in actions:
+                contexts["dataset"] = extract_and_summarize(self.root, ignore_dirs=self.ignore_dirs)
+
+            summary = generate_artifacts(
+                self.generator, self.client, actions, contexts,
+                output=self.output, workers=self.workers, base_dir=self.root,
+                scan={"root": self.root, "ignore_dirs": self.ignore_dirs,
+                      "ignore_exts": self.ignore_exts, "cache": self.index},
+                changed=triggers,
+            )
+            latency = time.monotonic() - first_event
+            span.set(latency_seconds=round(latency, 6))
+        self._written = {
+            os.path.normpath(os.path.relpath(path, self.root)) for item in summary for path in item["written"]
+        }
+
+        if len(actions) > 1:
+            print_summary(summary)
+        print(f"Regenerated in {latency:.2f}s after the first change.")
+        self.latencies.append(latency)
+        return latency
+
+    def run(self):
+        """Watch until interrupted."""
+        print(f"Watching {os.path.abspath(self.root)} for changes ({type(self.watcher).__name__}). Press Ctrl+C to stop.")
+        try:
+            while True:
+                self.step()
+        except KeyboardInterrupt:
+            print("\nStopped watching.")
+        finally:
+            self.watcher.close()
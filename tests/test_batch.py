@@ -0,0 +1,150 @@
+import json
+import os
+import types
+
+from docify_tool.batch import build_batch_requests, run_batch, run_openai_batch
+from docify_tool.generator import Generator
+
+
+class StandInBatchServer:
+    """
+    In-process stand-in for the OpenAI Files and Batches APIs.
+
+    Uploaded JSONL requests are answered by `respond(request)`, which returns a
+    response body, an error dict (routed to the error file) or None (no result).
+    The batch reports `in_progress` for `polls` retrieves and then `final_status`.
+    """
+
+    def __init__(self, respond, final_status="completed", polls=2):
+        self.respond = respond
+        self.final_status = final_status
+        self.polls = polls
+        self.uploads = {}
+        self.batches = {}
+        self.files = types.SimpleNamespace(create=self._create_file, content=self._file_content)
+        self.batches_api = types.SimpleNamespace(create=self._create_batch, retrieve=self._retrieve_batch)
+
+    # The client exposes `files` and `batches` like openai.OpenAI.
+    @property
+    def client(self):
+        return types.SimpleNamespace(files=self.files, batches=self.batches_api)
+
+    def _create_file(self, file, purpose):
+        name, body = file
+        file_id = f"file-{len(self.uploads)}"
+        self.uploads[file_id] = body.read().decode("utf-8")
+        return types.SimpleNamespace(id=file_id)
+
+    def _file_content(self, file_id):
+        return types.SimpleNamespace(text=self.uploads[file_id])
+
+    def _create_batch(self, input_file_id, endpoint, completion_window):
+        batch_id = f"batch-{len(self.batches)}"
+        self.batches[batch_id] = {"input": input_file_id, "retrieves": 0}
+        return types.SimpleNamespace(id=batch_id, status="validating")
+
+    def _retrieve_batch(self, batch_id):
+        state = self.batches[batch_id]
+        state["retrieves"] += 1
+        if state["retrieves"] <= self.polls:
+            return types.SimpleNamespace(id=batch_id, status="in_progress")
+
+        output, errors = [], []
+        for line in self.uploads[state["input"]].splitlines():
+            request = json.loads(line)
+            answer = self.respond(request)
+            if answer is None:
+                continue
+            if "error" in answer:
+                errors.append({"custom_id": request["custom_id"], "response": None, "error": answer["error"]})
+            else:
+                output.append({"custom_id": request["custom_id"],
+                               "response": {"status_code": 200, "body": answer}, "error": None})
+        output_id = self._store(output)
+        error_id = self._store(errors)
+        return types.SimpleNamespace(id=batch_id, status=self.final_status,
+                                     output_file_id=output_id, error_file_id=error_id)
+
+    def _store(self, lines):
+        if not lines:
+            return None
+        file_id = f"file-{len(self.uploads)}"
+        self.uploads[file_id] = "\n".join(json.dumps(line) for line in lines) + "\n"
+        return file_id
+
+
+def completion(text):
+    return {
+        "choices": [{"message": {"content": text}}],
+        "usage": {"prompt_tokens": 100, "completion_tokens": 5, "prompt_tokens_details": {"cached_tokens": 80}},
+    }
+
+
+def make_root(tmp_path, name):
+    root = tmp_path / name
+    root.mkdir()
+    (root / "main.py").write_text(f"print('{name}')\n", encoding="utf-8")
+    return str(root)
+
+
+def generator_for(server):
+    generator = Generator("key")
+    generator._clients["openai"] = server.client
+    return generator
+
+
+def test_submit_poll_and_collect(tmp_path):
+    roots = [make_root(tmp_path, "svc_a"), make_root(tmp_path, "svc_b")]
+
+    def respond(request):
+        if request["custom_id"] == "1-gha-svc_b":
+            return {"error": {"code": "server_error", "message": "boom"}}
+        return completion(f"```\ngenerated for {request['custom_id']}\n```")
+
+    server = StandInBatchServer(respond)
+    summary = run_batch(generator_for(server), "openai", roots, ["docker", "gha"], poll_interval=0)
+
+    assert server.batches["batch-0"]["retrieves"] == 3
+    uploaded = [json.loads(line) for line in server.uploads["file-0"].splitlines()]
+    assert len(uploaded) == 4
+    # Project context first, so every request of a root shares its prefix.
+    assert "svc_a" in uploaded[0]["body"]["messages"][1]["content"]
+
+    assert (tmp_path / "svc_a" / "Dockerfile").read_text(encoding="utf-8") == "generated for 0-docker-svc_a"
+    assert (tmp_path / "svc_a" / ".github" / "workflows" / "ci.yml").exists()
+    assert (tmp_path / "svc_b" / "Dockerfile").exists()
+    assert not (tmp_path / "svc_b" / ".github").exists()
+    failures = [status for _, status in summary if status.startswith("failed")]
+    assert len(failures) == 1 and "boom" in failures[0]
+
+
+def test_expired_batch_reports_missing_results(tmp_path):
+    roots = [make_root(tmp_path, "svc_a"), make_root(tmp_path, "svc_b")]
+    requests = build_batch_requests(roots, ["readme"])
+    server = StandInBatchServer(
+        lambda request: completion("# Done") if request["custom_id"].endswith("svc_a") else None,
+        final_status="expired", polls=0,
+    )
+    generator = generator_for(server)
+
+    results = run_openai_batch(generator, requests, poll_interval=0)
+
+    assert results["0-readme-svc_a"] == {"content": "# Done"}
+    assert results["1-readme-svc_b"] == {"error": "No result returned (batch expired)."}
+    assert generator.usage == [{"provider": "openai", "prompt_tokens": 100, "cached_tokens": 80, "output_tokens": 5}]
+
+
+def test_request_error_in_output_file_is_reported(tmp_path):
+    requests = build_batch_requests([make_root(tmp_path, "svc")], ["readme"])
+
+    class Server(StandInBatchServer):
+        def _retrieve_batch(self, batch_id):
+            batch = super()._retrieve_batch(batch_id)
+            line = {"custom_id": requests[0]["custom_id"],
+                    "response": {"status_code": 429, "body": {"error": {"message": "rate limited"}}}}
+            batch.output_file_id = self._store([line])
+            return batch
+
+    results = run_openai_batch(generator_for(Server(lambda request: None, polls=0)), requests, poll_interval=0)
+    assert "rate limited" in results[requests[0]["custom_id"]]["error"]
+    assert not os.path.exists(os.path.join(requests[0]["root"], "README.md"))
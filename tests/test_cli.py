@@ -0,0 +1,21 @@
+import argparse
+
+import pytest
+
+from docify_tool.artifacts import ARTIFACTS
+from docify_tool.cli import selected_artifacts
+
+
+def parse(**flags):
+    return argparse.Namespace(all=flags.pop("all", False), **{action: flags.get(action, False) for action in ARTIFACTS})
+
+
+@pytest.mark.parametrize("flags, expected", [
+    ({}, ["readme"]),
+    ({"docker": True, "gha": True}, ["docker", "gha"]),
+    ({"all": True}, ["readme", "test", "docker", "gha"]),
+    ({"all": True, "model_card": True}, ["readme", "test", "docker", "gha", "model_card"]),
+    ({"all": True, "notebook": True, "docker": True}, ["readme", "test", "docker", "gha", "notebook"]),
+])
+def test_selected_artifacts(flags, expected):
+    assert selected_artifacts(parse(**flags)) == expected
@@ -0,0 +1,141 @@
+import time
+import types
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from docify_tool import generator as generator_module
+from docify_tool.artifacts import generate_artifacts
+from docify_tool.generator import GEMINI_CACHE_MAX_ENTRIES, Generator
+
+CONTEXT = "x" * 20000  # above the Gemini caching minimum
+
+
+class FakeGemini:
+    """Stands in for google.generativeai: cached contents and models that record their use."""
+
+    def __init__(self):
+        self.created = []
+        self.deleted = []
+        self.cache_broken = False
+        self.in_flight = self.peak = 0
+        self.delay = 0
+        lock = threading.Lock()
+        fake = self
+
+        class CachedContent:
+            @classmethod
+            def create(cls, model, display_name, system_instruction, contents, ttl):
+                handle = cls()
+                fake.created.append(handle)
+                return handle
+
+            def delete(self):
+                fake.deleted.append(self)
+
+        class GenerativeModel:
+            def __init__(self, name, system_instruction=None, cached=None):
+                self.cached = cached
+
+            @classmethod
+            def from_cached_content(cls, cached_content):
+                return cls(None, cached=cached_content)
+
+            def generate_content(self, prompt):
+                with lock:
+                    fake.in_flight += 1
+                    fake.peak = max(fake.peak, fake.in_flight)
+                time.sleep(fake.delay)
+                with lock:
+                    fake.in_flight -= 1
+                if self.cached is not None and fake.cache_broken:
+                    raise RuntimeError("404 CachedContent not found")
+                usage = types.SimpleNamespace(
+                    prompt_token_count=10, cached_content_token_count=5000 if self.cached else 0,
+                    candidates_token_count=1,
+                )
+                return types.SimpleNamespace(text="ok", usage_metadata=usage)
+
+        self.caching = types.SimpleNamespace(CachedContent=CachedContent)
+        self.GenerativeModel = GenerativeModel
+
+    def configure(self, api_key=None):
+        pass
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    fake = FakeGemini()
+    monkeypatch.setattr(generator_module, "_gemini_sdk", lambda: fake)
+    return fake
+
+
+def test_shared_context_is_cached_once(gemini):
+    generator = Generator("key")
+    generator.generate_readme_gemini(CONTEXT, cache=True)
+    generator.generate_dockerfile_gemini(CONTEXT, cache=True)
+    assert len(gemini.created) == 1
+    assert [usage["cached_tokens"] for usage in generator.usage] == [5000, 5000]
+
+
+def test_run_caches_only_contexts_several_actions_share(gemini, tmp_path):
+    contexts = {"project": CONTEXT, "structure": "", "dataset": "", "retrieved": {
+        "gha": CONTEXT + "gha", "model_card": CONTEXT + "model card",
+    }}
+    generator = Generator("key")
+    actions = ["readme", "docker", "gha", "model_card"]  # docker retrieved nothing: it uses the project context
+    summary = generate_artifacts(generator, "gemini", actions, contexts, output=str(tmp_path))
+    assert {item["status"] for item in summary} == {"ok"}
+    assert len(gemini.created) == 1
+    assert sorted(usage["cached_tokens"] for usage in generator.usage) == [0, 0, 5000, 5000]
+
+    generate_artifacts(Generator("key"), "gemini", ["gha", "model_card"], contexts, output=str(tmp_path))
+    assert len(gemini.created) == 1
+
+
+def test_single_use_contexts_are_not_cached(gemini):
+    generator = Generator("key")
+    generator.generate_module_test_gemini(CONTEXT, "pkg.mod", "pkg/mod.py")
+    assert gemini.created == []
+
+
+def test_expired_handle_is_recreated_and_deleted(gemini):
+    generator = Generator("key")
+    generator.generate_readme_gemini(CONTEXT, cache=True)
+    key, (handle, _) = next(iter(generator._gemini_caches.items()))
+    generator._gemini_caches[key] = (handle, time.monotonic() - 1)
+
+    generator.generate_readme_gemini(CONTEXT, cache=True)
+    assert len(gemini.created) == 2
+    assert gemini.deleted == [handle]
+
+
+def test_rejected_handle_falls_back_to_inline_prompt(gemini):
+    generator = Generator("key")
+    generator.generate_readme_gemini(CONTEXT, cache=True)
+    gemini.cache_broken = True
+
+    assert generator.generate_readme_gemini(CONTEXT, cache=True) == "ok"
+    assert generator._gemini_caches == {}
+    assert generator.usage[-1]["cached_tokens"] == 0
+
+
+def test_handles_are_bounded_and_released(gemini):
+    generator = Generator("key")
+    for i in range(GEMINI_CACHE_MAX_ENTRIES + 3):
+        generator.generate_readme_gemini(CONTEXT + str(i), cache=True)
+    assert len(generator._gemini_caches) == GEMINI_CACHE_MAX_ENTRIES
+    assert gemini.deleted == gemini.created[:3]
+
+    generator.release_cached_contents()
+    assert sorted(map(id, gemini.deleted)) == sorted(map(id, gemini.created))
+
+
+def test_workers_bound_requests_across_threads_and_forks(gemini):
+    gemini.delay = 0.02
+    generator = Generator("key", workers=2)
+    forks = [generator, generator.fork()]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda i: forks[i % 2].generate_readme_gemini("context"), range(8)))
+    assert gemini.peak == 2
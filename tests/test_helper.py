@@ -0,0 +1,90 @@
+import json
+import time
+
+import pytest
+
+from docify_tool.helper import _parse_project_init_response, clean_fenced_content, loads_json_answer, repair_json
+
+# (broken model answer, expected value, cut off inside a string value)
+CORPUS = [
+    ('{"a": 1}', {"a": 1}, False),
+    ('```json\n{"a": 1}\n```', {"a": 1}, False),
+    ('```\n{"a": [1, 2]}\n```\n', {"a": [1, 2]}, False),
+    ('Here are the files:\n{"a": 1}\nLet me know if you need more.', {"a": 1}, False),
+    ('Sure [see below]:\n{"a": "[x]"}', {"a": "[x]"}, False),
+    ('{"a": 1,}', {"a": 1}, False),
+    ('{"a": [1, 2, ],\n}', {"a": [1, 2]}, False),
+    ('[1, 2,]', [1, 2], False),
+    ('{"a": "line one\nline two\tend"}', {"a": "line one\nline two\tend"}, False),
+    ('{"a": "has } and ] inside", "b": "x"}', {"a": "has } and ] inside", "b": "x"}, False),
+    ('{"a": "say \\"hi\\""}', {"a": 'say "hi"'}, False),
+    # Truncated output.
+    ('{"a": "x", "b": "half a str', {"a": "x", "b": "half a str"}, True),
+    ('{"a": "x", "b', {"a": "x"}, False),
+    ('{"a": "x", "b"', {"a": "x"}, False),
+    ('{"a": "x", "b":', {"a": "x"}, False),
+    ('{"a": "x", "b": ', {"a": "x"}, False),
+    ('{"a": "x",', {"a": "x"}, False),
+    ('{"a": {"b": [1, 2', {"a": {"b": [1, 2]}}, False),
+    ('{"a": "ends in escape \\', {"a": "ends in escape "}, True),
+    ('{"a": "ends in unicode \\u00', {"a": "ends in unicode "}, True),
+    ('{"a": "escaped backslash \\\\', {"a": "escaped backslash \\"}, True),
+    ('["one", "tw', ["one", "tw"], True),
+    ('```json\n{"a": "cut\nacross lines', {"a": "cut\nacross lines"}, True),
+]
+
+
+@pytest.mark.parametrize("text, expected, cut_off", CORPUS)
+def test_corpus_is_repaired_locally(text, expected, cut_off):
+    assert loads_json_answer(text) == (expected, cut_off)
+
+
+@pytest.mark.parametrize("text", ["", "no json here", "{]", '{"a": 1]}'])
+def test_unrecoverable_answers_raise(text):
+    with pytest.raises(ValueError):
+        loads_json_answer(text)
+
+
+def test_repair_keeps_valid_json_unchanged():
+    text = '{"a": [1, {"b": "c"}], "d": null}'
+    assert repair_json(text) == text
+
+
+def test_local_repair_is_much_faster_than_a_model_round_trip():
+    files = {f"tests/test_{i}.py": "def test_x():\n    assert 'value, with } and ]' \n" * 40 for i in range(200)}
+    text = "```json\n" + json.dumps(files, indent=2)[:-200] + ",\n"  # fenced, then cut off
+    start = time.perf_counter()
+    value, cut_off = loads_json_answer(text)
+    elapsed = time.perf_counter() - start
+
+    assert cut_off and len(value) == len(files)
+    # A fix_json model call re-sends and re-generates the whole answer: seconds, not milliseconds.
+    assert elapsed < 0.5
+
+
+def test_init_response_drops_the_file_cut_off():
+    raw = '{"README.md": "# App\\n", "app/main.py": "def main():\\n    pri'
+    assert _parse_project_init_response(raw) == {"README.md": "# App\n"}
+
+
+def test_init_response_drops_non_string_contents():
+    raw = '{"README.md": "# App", "app/": {}, "setup.py": null}'
+    assert _parse_project_init_response(raw) == {"README.md": "# App"}
+
+
+def test_init_response_asks_the_model_only_when_local_repair_fails():
+    calls = []
+
+    def fix_json(text):
+        calls.append(text)
+        return '{"main.py": "print(1)"}'
+
+    assert _parse_project_init_response('{"main.py": "print(1)",}', fix_json) == {"main.py": "print(1)"}
+    assert calls == []
+    assert _parse_project_init_response("not json at all", fix_json) == {"main.py": "print(1)"}
+    assert calls == ["not json at all"]
+
+
+def test_clean_fenced_content_strips_outer_fences_only():
+    assert clean_fenced_content("```python\nx = 1\n```") == "x = 1"
+    assert clean_fenced_content("text\n```\ncode\n```") == "text\n```\ncode"
@@ -0,0 +1,72 @@
+import ast
+
+import pytest
+
+from docify_tool.python_source import find_missing_docstrings, format_docstring, insert_docstrings
+
+
+def add_docstrings(source, text="Doc."):
+    """Splice `text` as the docstring of every symbol that lacks one."""
+    symbols = find_missing_docstrings(source)
+    insertions = [(symbol["insert_line"], format_docstring(text, symbol["indent"])) for symbol in symbols]
+    return symbols, insert_docstrings(source, insertions)
+
+
+def test_inserts_docstrings_at_symbol_bodies():
+    source = "import os\n\n\ndef f(a):\n    return a\n\n\nclass A:\n    x = 1\n\n    def g(self):\n        pass\n"
+    symbols, result = add_docstrings(source)
+    assert [symbol["name"] for symbol in symbols] == ["", "f", "A", "A.g"]
+    tree = ast.parse(result)
+    assert ast.get_docstring(tree) == "Doc."
+    assert all(ast.get_docstring(node) == "Doc." for node in ast.walk(tree)
+               if isinstance(node, (ast.FunctionDef, ast.ClassDef)))
+
+
+@pytest.mark.parametrize("source", [
+    "class A:\n    @property\n    def x(self):\n        return 1\n",
+    "class A:\n    @staticmethod\n    @other(\n        1,\n    )\n    def x():\n        return 1\n",
+    "class A:\n    @dataclass\n    class B:\n        y: int = 0\n",
+    "@pytest.fixture\ndef f():\n    return 1\n",
+])
+def test_docstring_goes_above_decorators_of_first_statement(source):
+    _, result = add_docstrings(source)
+    tree = ast.parse(result)
+    assert ast.get_docstring(tree) == "Doc."
+    assert ast.get_docstring(tree.body[-1]) == "Doc."
+    assert "@" not in result.split('"""Doc."""')[0]
+
+
+def test_class_docstring_is_indented_like_its_body():
+    _, result = add_docstrings("class A:\n    @property\n    def x(self):\n        return 1\n")
+    assert 'class A:\n    """Doc."""\n    @property\n' in result
+
+
+def test_skips_body_on_signature_continuation_line():
+    source = "def f(a,\n      b): return 1\n\n\ndef g(a,\n      b):\n    return 2\n"
+    symbols, result = add_docstrings(source)
+    assert [symbol["name"] for symbol in symbols] == ["", "g"]
+    tree = ast.parse(result)
+    assert ast.get_docstring(tree.body[1]) is None
+    assert ast.get_docstring(tree.body[2]) == "Doc."
+
+
+def test_skips_one_line_definitions():
+    symbols = find_missing_docstrings('"""Module."""\ndef f(): return 1\nclass A: pass\n')
+    assert symbols == []
+
+
+@pytest.mark.parametrize("text", ['Says "hi"', 'Ends with a backslash \\', 'Has """ inside', '"Quoted"'])
+def test_single_line_docstring_stays_valid(text):
+    _, result = add_docstrings("def f():\n    return 1\n", text)
+    assert ast.get_docstring(ast.parse(result).body[-1]) == text
+
+
+def test_multi_line_docstring_is_reindented():
+    literal = format_docstring('"""Summary.\n\n    Args:\n        a: value.\n"""', "    ")
+    assert literal == '    """Summary.\n\n    Args:\n        a: value.\n    """'
+
+
+def test_crlf_line_endings_are_kept():
+    _, result = add_docstrings("def f():\r\n    return 1\r\n")
+    assert "\n" not in result.replace("\r\n", "")
+    assert ast.get_docstring(ast.parse(result).body[-1]) == "Doc."
@@ -0,0 +1,73 @@
+import os
+
+from docify_tool.readme_sections import classify_section, section_inputs, split_sections, write_readme_incremental
+
+README = """# Project
+
+Intro.
+
+## Installation
+
+pip install project
+
+## API Reference
+
+Old API.
+
+## License
+
+MIT
+"""
+
+
+class StubGenerator:
+    def __init__(self):
+        self.sections = []
+
+    def generate_readme_gemini(self, project_context):
+        return README
+
+    def generate_readme_section_gemini(self, context, section):
+        self.sections.append(section.splitlines()[0])
+        return section.splitlines()[0] + "\n\nUpdated."
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def run(generator, root):
+    write_readme_incremental(generator, "gemini", str(root), "", str(root / "README.md"), ignore_dirs=[".docify"])
+
+
+def test_split_and_classify_sections():
+    sections = split_sections(README + "```\n## not a heading\n```\n")
+    assert [heading for heading, _ in sections] == ["", "## Installation", "## API Reference", "## License"]
+    assert [classify_section(heading) for heading, _ in sections] == ["overview", "installation", "api", "license"]
+    assert section_inputs("api", ["pkg/a.py", "tests/test_a.py", "setup.py"]) == ["pkg/a.py", "setup.py"]
+
+
+def test_new_module_refreshes_api_section(tmp_path):
+    write(str(tmp_path / "pyproject.toml"), "[project]\n")
+    write(str(tmp_path / "pkg" / "a.py"), "def a():\n    pass\n")
+    generator = StubGenerator()
+    run(generator, tmp_path)
+    assert generator.sections == []
+
+    write(str(tmp_path / "pkg" / "b.py"), "def b():\n    pass\n")
+    run(generator, tmp_path)
+
+    # The intro is structural, so it is refreshed when files are added as well.
+    assert sorted(generator.sections) == ["# Project", "## API Reference"]
+    readme = (tmp_path / "README.md").read_text(encoding="utf-8")
+    assert "Updated." in readme and "pip install project" in readme and "MIT" in readme
+
+
+def test_unchanged_tree_regenerates_nothing(tmp_path):
+    write(str(tmp_path / "pkg" / "a.py"), "def a():\n    pass\n")
+    generator = StubGenerator()
+    run(generator, tmp_path)
+    run(generator, tmp_path)
+    assert generator.sections == []
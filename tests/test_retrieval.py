@@ -0,0 +1,27 @@
+import os
+
+from docify_tool.artifacts import build_contexts, has_content
+from docify_tool.retrieval import INDEX_FILE, retrieve_contexts
+from docify_tool.scanner import SIDECAR_DIR
+
+SPEC = {"docker": {"query": "requirements dependencies entrypoint", "budget": 4000, "pinned": ["requirements.txt"]}}
+
+
+def test_missing_root_has_no_content_and_writes_no_index(tmp_path):
+    root = str(tmp_path / "nosuchdir")
+    contexts = build_contexts(root, ["docker"])
+    assert not has_content(contexts, ["docker"])
+    assert not os.path.exists(root)
+
+
+def test_empty_project_writes_no_index(tmp_path):
+    assert retrieve_contexts(str(tmp_path), SPEC) == {"docker": ""}
+    assert not os.path.exists(tmp_path / SIDECAR_DIR)
+
+
+def test_selected_files_are_retrieved_and_indexed(tmp_path):
+    (tmp_path / "requirements.txt").write_text("flask\n")
+    contexts = build_contexts(str(tmp_path), ["docker"])
+    assert has_content(contexts, ["docker"])
+    assert "--- File: requirements.txt ---" in contexts["retrieved"]["docker"]
+    assert os.path.exists(tmp_path / SIDECAR_DIR / INDEX_FILE)
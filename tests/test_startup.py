@@ -0,0 +1,47 @@
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time of docify_tool.cli. Without the provider SDKs it takes ~0.1s;
+# importing google.generativeai or openai eagerly adds several times that.
+STARTUP_BUDGET_SECONDS = 0.5
+RUNS = 3
+
+CHECK_SDKS = """
+import sys
+import docify_tool.cli
+try:
+    sys.argv = ["docify", "--help"]
+    docify_tool.cli.main()
+except SystemExit:
+    pass
+loaded = [name for name in sys.modules if name.split(".")[0] == "openai" or name.startswith("google.generativeai")]
+assert not loaded, loaded
+"""
+
+
+def run_python(*args):
+    return subprocess.run(
+        [sys.executable, *args], cwd=ROOT, capture_output=True, text=True,
+        env=dict(os.environ, PYTHONPATH=ROOT), check=True,
+    )
+
+
+def cli_import_seconds():
+    """Cumulative import time of docify_tool.cli, as reported by -X importtime."""
+    stderr = run_python("-X", "importtime", "-c", "import docify_tool.cli").stderr
+    match = re.search(r"^import time:\s*\d+\s*\|\s*(\d+)\s*\|\s*docify_tool\.cli$", stderr, re.MULTILINE)
+    assert match, stderr[-2000:]
+    return int(match.group(1)) / 1e6
+
+
+def test_cli_startup_does_not_import_provider_sdks():
+    run_python("-c", CHECK_SDKS)
+
+
+def test_cli_import_time_is_within_budget():
+    seconds = min(cli_import_seconds() for _ in range(RUNS))
+    assert seconds < STARTUP_BUDGET_SECONDS, f"docify_tool.cli took {seconds:.3f}s to import"
@@ -0,0 +1,149 @@
+import os
+import sys
+import threading
+
+import pytest
+
+from docify_tool.sharded_tests import plan_test_shards
+from docify_tool.watch import InotifyWatcher, WatchSession
+
+IGNORE_DIRS = [".git", "__pycache__", ".docify"]
+
+
+class StubGenerator:
+    """Answers every request instantly and records which modules tests were asked for."""
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _record(self, *call):
+        with self._lock:
+            self.calls.append(call)
+
+    def generate_readme_gemini(self, project_context, cache=False):
+        self._record("readme")
+        return "# Project\n"
+
+    def generate_module_test_gemini(self, context, module, path):
+        self._record("test", module)
+        return f"import {module}\n\n\ndef test_import():\n    assert {module}\n"
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+@pytest.fixture(params=["polling", "inotify"])
+def session(request, tmp_path):
+    for name in ("alpha", "beta", "gamma"):
+        write(str(tmp_path / "pkg" / f"{name}.py"), f"def {name}():\n    return 1\n")
+    write(str(tmp_path / "pkg" / "__init__.py"), "")
+    if request.param == "inotify" and not sys.platform.startswith("linux"):
+        pytest.skip("inotify is Linux only")
+
+    generator = StubGenerator()
+    session = WatchSession(
+        generator, "gemini", str(tmp_path), ["readme", "test"], ignore_dirs=IGNORE_DIRS,
+        output="gen", workers=2, debounce=0.2, force_polling=request.param == "polling",
+    )
+    if request.param == "inotify" and not isinstance(session.watcher, InotifyWatcher):
+        session.watcher.close()
+        pytest.skip("inotify unavailable")
+    session.watcher.interval = 0.05
+    yield session, generator, tmp_path
+    session.watcher.close()
+
+
+def test_change_regenerates_affected_artifacts(session):
+    session, generator, root = session
+    write(str(root / "pkg" / "beta.py"), "def beta():\n    return 2\n")
+
+    latency = session.step(timeout=5)
+
+    assert latency is not None and latency < 5
+    assert sorted(generator.calls) == [("readme",), ("test", "pkg.beta")]
+    assert (root / "gen" / "README.md").exists()
+    assert (root / "gen" / "tests" / "test_beta.py").exists()
+    assert not (root / "gen" / "tests" / "test_alpha.py").exists()
+
+
+def test_own_output_does_not_trigger_regeneration(session):
+    session, generator, root = session
+    write(str(root / "pkg" / "alpha.py"), "def alpha():\n    return 3\n")
+    assert session.step(timeout=5) is not None
+    generator.calls.clear()
+
+    # The cycle's own writes below gen/ are seen by the watcher but filtered out.
+    assert session.step(timeout=1) is None
+    assert generator.calls == []
+
+
+def test_docker_gets_retrieved_context(tmp_path):
+    write(str(tmp_path / "requirements.txt"), "flask\n")
+    write(str(tmp_path / "app.py"), "from flask import Flask\napp = Flask(__name__)\n")
+    write(str(tmp_path / "notes" / "big.txt"), "unrelated text\n" * 5000)
+    contexts = []
+
+    class DockerGenerator(StubGenerator):
+        def generate_dockerfile_gemini(self, project_context, cache=False):
+            contexts.append(project_context)
+            return "FROM python:3.12\n"
+
+    # .docify is not ignored here: the retrieval index written there must not retrigger.
+    session = WatchSession(DockerGenerator(), "gemini", str(tmp_path), ["docker"], ignore_dirs=[".git"],
+                           debounce=0.2, force_polling=True)
+    session.watcher.interval = 0.05
+    try:
+        write(str(tmp_path / "requirements.txt"), "flask\ngunicorn\n")
+        assert session.step(timeout=5) is not None
+        assert session.step(timeout=1) is None
+    finally:
+        session.watcher.close()
+
+    assert len(contexts) == 1
+    assert "gunicorn" in contexts[0] and "--- Project files ---" in contexts[0]
+    assert "unrelated text" not in contexts[0]
+    assert (tmp_path / ".docify" / "index.json").exists()
+
+
+def test_user_edits_under_tests_still_trigger(tmp_path):
+    write(str(tmp_path / "pkg" / "alpha.py"), "def alpha():\n    return 1\n")
+    calls = []
+
+    class GhaGenerator(StubGenerator):
+        def generate_gha_gemini(self, project_context, cache=False):
+            calls.append("gha")
+            return "name: CI\n"
+
+    # Without --output, generated tests land in tests/ next to the user's own.
+    session = WatchSession(GhaGenerator(), "gemini", str(tmp_path), ["test", "gha"], ignore_dirs=IGNORE_DIRS,
+                           debounce=0.2, force_polling=True)
+    session.watcher.interval = 0.05
+    try:
+        write(str(tmp_path / "pkg" / "alpha.py"), "def alpha():\n    return 2\n")
+        assert session.step(timeout=5) is not None
+        assert (tmp_path / "tests" / "test_alpha.py").exists()
+        assert session.step(timeout=1) is None
+        assert calls == []
+
+        write(str(tmp_path / "tests" / "test_manual.py"), "def test_manual():\n    assert True\n")
+        assert session.step(timeout=5) is not None
+    finally:
+        session.watcher.close()
+
+    assert calls == ["gha"]
+
+
+def test_scans_read_from_the_project_index(tmp_path):
+    write(str(tmp_path / "pkg" / "alpha.py"), "def alpha():\n    return 1\n")
+    session = WatchSession(StubGenerator(), "gemini", str(tmp_path), ["test"], ignore_dirs=IGNORE_DIRS,
+                           force_polling=True)
+    session.watcher.close()
+
+    # Not applied to the index yet: scans still see the indexed text.
+    write(str(tmp_path / "pkg" / "alpha.py"), "ALPHA = 2\n")
+    shards = plan_test_shards(str(tmp_path), IGNORE_DIRS, cache=session.index)
+    assert [shard["source"] for shard in shards] == ["def alpha():\n    return 1\n"]